@@ -7,20 +7,20 @@ import "../styles/CompareStates.scss";
 interface State {
   _id: string;
   Name: string;
-  MedianHomePrice: string;
-  CapitalGainsTax: string;
-  IncomeTax: string;
-  SalesTax: string;
-  PropertyTaxes: string;
+  MedianHomePrice: number;
+  CapitalGainsTax: number;
+  IncomeTax: number;
+  SalesTax: number;
+  PropertyTaxes: number;
   Abortion: string;
-  CostOfLiving: string;
-  K12SchoolPerformance: string;
-  HigherEdSchoolPerformance: string;
-  ForestedLand: string;
+  CostOfLiving: number;
+  K12SchoolPerformance: number;
+  HigherEdSchoolPerformance: number;
+  ForestedLand: number;
   GunLaws: string;
   MinimumWage: string;
-  Population: string;
-  ViolentCrimes: string;
+  Population: number;
+  ViolentCrimes: number;
   PoliticalLeaning: string;
   createdAt: string;
   updatedAt: string;
@@ -47,6 +47,28 @@ const higherIsBetter = [
   "MinimumWage",
 ];
 
+// Decimal places shown for numeric metrics, as the values used to be stored
+const METRIC_DECIMALS: Partial<Record<keyof State, number>> = {
+  MedianHomePrice: 2,
+  CapitalGainsTax: 2,
+  IncomeTax: 2,
+  SalesTax: 2,
+  PropertyTaxes: 2,
+  CostOfLiving: 1,
+  ForestedLand: 2,
+  ViolentCrimes: 1,
+};
+
+// A metric's value as text at its usual precision, e.g. 9 -> "9.00"
+const metricText = (state: State, metric: keyof State): string => {
+  const value = state[metric];
+  const decimals = METRIC_DECIMALS[metric];
+  if (typeof value === "number") {
+    return decimals !== undefined ? value.toFixed(decimals) : String(value);
+  }
+  return value;
+};
+
 const CompareStates = () => {
   const [states, setStates] = useState<State[]>([]);
   const [selectedStates, setSelectedStates] = useState<string[]>([
@@ -290,7 +312,7 @@ const CompareStates = () => {
                     // Get all values for this metric
                     const metricValues = selectedStates.map((stateName) => {
                       const state = getStateByName(stateName);
-                      return state ? (state[metric] as string) : "";
+                      return state ? metricText(state, metric) : "";
                     });
 
                     return (
@@ -303,7 +325,7 @@ const CompareStates = () => {
                         </td>
                         {selectedStates.map((stateName, index) => {
                           const state = getStateByName(stateName);
-                          const value = state ? (state[metric] as string) : "";
+                          const value = state ? metricText(state, metric) : "";
 
                           // Get all other values for comparison
                           const otherValues = metricValues.filter(
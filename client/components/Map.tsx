@@ -6,20 +6,20 @@ import { ComposableMap, Geographies, Geography } from "react-simple-maps";
 interface State {
   _id: string;
   Name: string;
-  MedianHomePrice: string;
-  CapitalGainsTax: string;
-  IncomeTax: string;
-  SalesTax: string;
-  PropertyTaxes: string;
+  MedianHomePrice: number;
+  CapitalGainsTax: number;
+  IncomeTax: number;
+  SalesTax: number;
+  PropertyTaxes: number;
   Abortion: string;
-  CostOfLiving: string;
-  K12SchoolPerformance: string;
-  HigherEdSchoolPerformance: string;
-  ForestedLand: string;
+  CostOfLiving: number;
+  K12SchoolPerformance: number;
+  HigherEdSchoolPerformance: number;
+  ForestedLand: number;
   GunLaws: string;
   MinimumWage: string;
-  Population: string;
-  ViolentCrimes: string;
+  Population: number;
+  ViolentCrimes: number;
   PoliticalLeaning: string;
 }
 
@@ -152,12 +152,12 @@ const getPoliticalColor = (leaning: string): string => {
   }
 };
 
-const formatValue = (key: string, value: string): string => {
+const formatValue = (key: string, value: number | string): string => {
   if (key === "Population" || key === "MedianHomePrice") {
     return new Intl.NumberFormat("en-US", {
       style: "decimal",
       maximumFractionDigits: 0,
-    }).format(parseFloat(value));
+    }).format(Number(value));
   }
   if (
     key === "IncomeTax" ||
@@ -165,12 +165,13 @@ const formatValue = (key: string, value: string): string => {
     key === "PropertyTaxes" ||
     key === "CapitalGainsTax"
   ) {
-    return `${value}%`;
+    return `${Number(value).toFixed(2)}%`;
   }
   if (key === "MinimumWage" && value !== "No state law") {
-    return `$${value}`;
+    const wage = Number(value);
+    return isNaN(wage) ? `$${value}` : `$${wage.toFixed(2)}`;
   }
-  return value;
+  return String(value);
 };
 
 const Map = () => {
@@ -466,7 +467,7 @@ const Map = () => {
                   <p className="text-default-600 dark:text-default-400">
                     <span className="font-medium">Cost of Living:</span>{" "}
                     <strong className="text-foreground">
-                      {selectedState.CostOfLiving}
+                      {selectedState.CostOfLiving.toFixed(1)}
                     </strong>
                   </p>
                   <p className="text-default-600 dark:text-default-400">
@@ -523,13 +524,13 @@ const Map = () => {
                   <p className="text-default-600 dark:text-default-400">
                     <span className="font-medium">Violent Crimes:</span>{" "}
                     <strong className="text-foreground">
-                      {selectedState.ViolentCrimes}
+                      {selectedState.ViolentCrimes.toFixed(1)}
                     </strong>
                   </p>
                   <p className="text-default-600 dark:text-default-400">
                     <span className="font-medium">Forested Land:</span>{" "}
                     <strong className="text-foreground">
-                      {selectedState.ForestedLand}%
+                      {selectedState.ForestedLand.toFixed(2)}%
                     </strong>
                   </p>
                 </div>
@@ -41,20 +41,20 @@ import axios from "axios";
 interface State {
   _id: string;
   Name: string;
-  MedianHomePrice: string;
-  CapitalGainsTax: string;
-  IncomeTax: string;
-  SalesTax: string;
-  PropertyTaxes: string;
+  MedianHomePrice: number;
+  CapitalGainsTax: number;
+  IncomeTax: number;
+  SalesTax: number;
+  PropertyTaxes: number;
   Abortion: string;
-  CostOfLiving: string;
-  K12SchoolPerformance: string;
-  HigherEdSchoolPerformance: string;
-  ForestedLand: string;
+  CostOfLiving: number;
+  K12SchoolPerformance: number;
+  HigherEdSchoolPerformance: number;
+  ForestedLand: number;
   GunLaws: string;
   MinimumWage: string;
-  Population: string;
-  ViolentCrimes: string;
+  Population: number;
+  ViolentCrimes: number;
   PoliticalLeaning: string;
 }
 
@@ -301,11 +301,11 @@ const Moving = () => {
     // ==========================================
     const fromIncomeTax = calculateEffectiveStateIncomeTax(
       preferences.income,
-      parseFloat(fromState.IncomeTax)
+      fromState.IncomeTax
     );
     const toIncomeTax = calculateEffectiveStateIncomeTax(
       preferences.income,
-      parseFloat(toState.IncomeTax)
+      toState.IncomeTax
     );
     const incomeTaxDiff = fromIncomeTax - toIncomeTax;
 
@@ -324,16 +324,16 @@ const Moving = () => {
     const SALES_SHARE_OF_CONSUMPTION = 0.50;
     const taxableSpend = preferences.income * userConsumptionShare * SALES_SHARE_OF_CONSUMPTION;
     
-    const fromSalesTaxRate = parseFloat(fromState.SalesTax) / 100;
-    const toSalesTaxRate = parseFloat(toState.SalesTax) / 100;
+    const fromSalesTaxRate = fromState.SalesTax / 100;
+    const toSalesTaxRate = toState.SalesTax / 100;
     
     const salesTaxDiff = taxableSpend * (fromSalesTaxRate - toSalesTaxRate);
 
     // ==========================================
     // (3) PROPERTY TAX IMPACT
     // ==========================================
-    const fromPropertyTaxRate = parseFloat(fromState.PropertyTaxes) / 100;
-    const toPropertyTaxRate = parseFloat(toState.PropertyTaxes) / 100;
+    const fromPropertyTaxRate = fromState.PropertyTaxes / 100;
+    const toPropertyTaxRate = toState.PropertyTaxes / 100;
     
     const fromPropertyTax = preferences.houseValue * fromPropertyTaxRate;
     const toPropertyTax = preferences.houseValue * toPropertyTaxRate;
@@ -343,8 +343,8 @@ const Moving = () => {
     // (4) COST OF LIVING IMPACT
     // ==========================================
     // Cost of living affects consumption (not savings)
-    const fromCostOfLiving = parseFloat(fromState.CostOfLiving);
-    const toCostOfLiving = parseFloat(toState.CostOfLiving);
+    const fromCostOfLiving = fromState.CostOfLiving;
+    const toCostOfLiving = toState.CostOfLiving;
     
     const consumption = preferences.income * userConsumptionShare;
     const costOfLivingImpact = consumption * (1 - toCostOfLiving / fromCostOfLiving);
@@ -723,7 +723,7 @@ const Moving = () => {
                     </span>
                   </td>
                   <td className="px-6 py-4 border-b border-default-200 dark:border-default-100">
-                    {parseInt(fromState.Population).toLocaleString()}
+                    {fromState.Population.toLocaleString()}
                   </td>
                   <td
                     className={`px-6 py-4 border-b border-default-200 dark:border-default-100 font-semibold ${
@@ -742,7 +742,7 @@ const Moving = () => {
                           : ""
                     }`}
                   >
-                    {parseInt(toState.Population).toLocaleString()}
+                    {toState.Population.toLocaleString()}
                   </td>
                 </tr>
                 <tr className="hover:bg-default-100 dark:hover:bg-default-50/5">
@@ -750,17 +750,17 @@ const Moving = () => {
                     Cost of Living Index
                   </td>
                   <td className="px-6 py-4 border-b border-default-200 dark:border-default-100">
-                    {fromState.CostOfLiving}
+                    {fromState.CostOfLiving.toFixed(1)}
                   </td>
                   <td
                     className={`px-6 py-4 border-b border-default-200 dark:border-default-100 font-semibold ${
-                      parseFloat(toState.CostOfLiving) <
-                      parseFloat(fromState.CostOfLiving)
+                      toState.CostOfLiving <
+                      fromState.CostOfLiving
                         ? "text-pastel-green-dark"
                         : "text-pastel-red-dark"
                     }`}
                   >
-                    {toState.CostOfLiving}
+                    {toState.CostOfLiving.toFixed(1)}
                   </td>
                 </tr>
                 <tr className="hover:bg-default-100 dark:hover:bg-default-50/5">
@@ -768,17 +768,17 @@ const Moving = () => {
                     Income Tax Rate
                   </td>
                   <td className="px-6 py-4 border-b border-default-200 dark:border-default-100">
-                    {fromState.IncomeTax}%
+                    {fromState.IncomeTax.toFixed(2)}%
                   </td>
                   <td
                     className={`px-6 py-4 border-b border-default-200 dark:border-default-100 font-semibold ${
-                      parseFloat(toState.IncomeTax) <=
-                      parseFloat(fromState.IncomeTax)
+                      toState.IncomeTax <=
+                      fromState.IncomeTax
                         ? "text-pastel-green-dark"
                         : "text-pastel-red-dark"
                     }`}
                   >
-                    {toState.IncomeTax}%
+                    {toState.IncomeTax.toFixed(2)}%
                   </td>
                 </tr>
                 <tr className="hover:bg-default-100 dark:hover:bg-default-50/5">
@@ -786,17 +786,17 @@ const Moving = () => {
                     Sales Tax
                   </td>
                   <td className="px-6 py-4 border-b border-default-200 dark:border-default-100">
-                    {fromState.SalesTax}%
+                    {fromState.SalesTax.toFixed(2)}%
                   </td>
                   <td
                     className={`px-6 py-4 border-b border-default-200 dark:border-default-100 font-semibold ${
-                      parseFloat(toState.SalesTax) <=
-                      parseFloat(fromState.SalesTax)
+                      toState.SalesTax <=
+                      fromState.SalesTax
                         ? "text-pastel-green-dark"
                         : "text-pastel-red-dark"
                     }`}
                   >
-                    {toState.SalesTax}%
+                    {toState.SalesTax.toFixed(2)}%
                   </td>
                 </tr>
                 <tr className="hover:bg-default-100 dark:hover:bg-default-50/5">
@@ -804,17 +804,17 @@ const Moving = () => {
                     Property Tax Rate
                   </td>
                   <td className="px-6 py-4 border-b border-default-200 dark:border-default-100">
-                    {fromState.PropertyTaxes}%
+                    {fromState.PropertyTaxes.toFixed(2)}%
                   </td>
                   <td
                     className={`px-6 py-4 border-b border-default-200 dark:border-default-100 font-semibold ${
-                      parseFloat(toState.PropertyTaxes) <=
-                      parseFloat(fromState.PropertyTaxes)
+                      toState.PropertyTaxes <=
+                      fromState.PropertyTaxes
                         ? "text-pastel-green-dark"
                         : "text-pastel-red-dark"
                     }`}
                   >
-                    {toState.PropertyTaxes}%
+                    {toState.PropertyTaxes.toFixed(2)}%
                   </td>
                 </tr>
                 <tr className="hover:bg-default-100 dark:hover:bg-default-50/5">
@@ -826,8 +826,8 @@ const Moving = () => {
                   </td>
                   <td
                     className={`px-6 py-4 border-b border-default-200 dark:border-default-100 font-semibold ${
-                      parseInt(toState.K12SchoolPerformance) <=
-                      parseInt(fromState.K12SchoolPerformance)
+                      toState.K12SchoolPerformance <=
+                      fromState.K12SchoolPerformance
                         ? "text-pastel-green-dark"
                         : "text-pastel-red-dark"
                     }`}
@@ -844,8 +844,8 @@ const Moving = () => {
                   </td>
                   <td
                     className={`px-6 py-4 border-b border-default-200 dark:border-default-100 font-semibold ${
-                      parseInt(toState.HigherEdSchoolPerformance) <=
-                      parseInt(fromState.HigherEdSchoolPerformance)
+                      toState.HigherEdSchoolPerformance <=
+                      fromState.HigherEdSchoolPerformance
                         ? "text-pastel-green-dark"
                         : "text-pastel-red-dark"
                     }`}
@@ -857,16 +857,16 @@ const Moving = () => {
                   <td className="px-6 py-4 font-semibold text-default-700 dark:text-default-300">
                     Violent Crime Rate
                   </td>
-                  <td className="px-6 py-4">{fromState.ViolentCrimes}</td>
+                  <td className="px-6 py-4">{fromState.ViolentCrimes.toFixed(1)}</td>
                   <td
                     className={`px-6 py-4 font-semibold ${
-                      parseFloat(toState.ViolentCrimes) <=
-                      parseFloat(fromState.ViolentCrimes)
+                      toState.ViolentCrimes <=
+                      fromState.ViolentCrimes
                         ? "text-pastel-green-dark"
                         : "text-pastel-red-dark"
                     }`}
                   >
-                    {toState.ViolentCrimes}
+                    {toState.ViolentCrimes.toFixed(1)}
                   </td>
                 </tr>
               </tbody>
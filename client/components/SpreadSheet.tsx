@@ -7,25 +7,25 @@ import "../styles/SpreadSheet.scss";
 interface State {
   _id: string;
   Name: string;
-  MedianHomePrice: string;
-  CapitalGainsTax: string;
-  IncomeTax: string;
-  SalesTax: string;
-  PropertyTaxes: string;
+  MedianHomePrice: number;
+  CapitalGainsTax: number;
+  IncomeTax: number;
+  SalesTax: number;
+  PropertyTaxes: number;
   Abortion: string;
-  CostOfLiving: string;
-  K12SchoolPerformance: string;
-  HigherEdSchoolPerformance: string;
-  ForestedLand: string;
+  CostOfLiving: number;
+  K12SchoolPerformance: number;
+  HigherEdSchoolPerformance: number;
+  ForestedLand: number;
   GunLaws: string;
   MinimumWage: string;
-  Population: string;
-  ViolentCrimes: string;
+  Population: number;
+  ViolentCrimes: number;
   PoliticalLeaning: string;
   createdAt: string;
   updatedAt: string;
   __v: number;
-  affordabilityScore?: number;
+  AffordabilityScore?: number;
 }
 
 interface Filters {
@@ -34,6 +34,18 @@ interface Filters {
   PoliticalLeaning: string;
 }
 
+// Decimal places shown for numeric columns, as the values used to be stored
+const FIELD_DECIMALS: Partial<Record<keyof State, number>> = {
+  MedianHomePrice: 2,
+  CapitalGainsTax: 2,
+  IncomeTax: 2,
+  SalesTax: 2,
+  PropertyTaxes: 2,
+  CostOfLiving: 1,
+  ForestedLand: 2,
+  ViolentCrimes: 1,
+};
+
 const SpreadSheet = () => {
   const [states, setStates] = useState<State[]>([]);
   const [sortColumn, setSortColumn] = useState<string>("Name");
@@ -418,10 +430,13 @@ const SpreadSheet = () => {
                       {displayColumns.map((column) => {
                         const value = state[column];
                         let displayValue = value;
+                        const decimals = FIELD_DECIMALS[column];
 
                         // Special formatting for grade columns
                         if (column === "Abortion" || column === "GunLaws") {
                           displayValue = formatGrade(value as string);
+                        } else if (typeof value === "number" && decimals !== undefined) {
+                          displayValue = value.toFixed(decimals);
                         }
 
                         return (
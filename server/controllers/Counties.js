@@ -0,0 +1,105 @@
+const Counties = require("../models/Counties");
+const countyFields = (body) => ({
+  Fips: body.Fips,
+  StateFips: body.StateFips,
+  State: body.State,
+  County: body.County,
+  SalesTax: body.SalesTax,
+  PropertyTaxes: body.PropertyTaxes,
+});
+exports.createCounties = async (req, res) => {
+  try {
+    let newCounties = new Counties(countyFields(req.body));
+    await newCounties.save();
+    res.send(newCounties);
+  } catch (err) {
+    console.log(err);
+    res.status(500).json({ error: err.message });
+  }
+};
+exports.bulkUpsertCounties = async (req, res) => {
+  try {
+    const counties = Array.isArray(req.body.counties) ? req.body.counties : [];
+    const operations = counties.map((county) => ({
+      updateOne: {
+        filter: { Fips: county.Fips },
+        update: { $set: countyFields(county) },
+        upsert: true,
+      },
+    }));
+    if (operations.length === 0) {
+      return res.json({ matched: 0, modified: 0, upserted: 0 });
+    }
+    const result = await Counties.bulkWrite(operations, { ordered: false });
+    res.json({
+      matched: result.matchedCount,
+      modified: result.modifiedCount,
+      upserted: result.upsertedCount,
+    });
+  } catch (err) {
+    console.log(err);
+    res.status(500).json({ error: err.message });
+  }
+};
+exports.readCounties = async (req, res) => {
+  const page = parseInt(req.query.page || 0);
+  const limit = parseInt(req.query.limit || 100);
+  try {
+    let query = {};
+    if (req.query.StateFips) {
+      query.StateFips = req.query.StateFips;
+    }
+    if (req.query.State) {
+      query.State = req.query.State;
+    }
+    const result = await Counties.find(query)
+      .sort({ Fips: 1 })
+      .skip(page * limit)
+      .limit(limit);
+    const total = await Counties.countDocuments(query);
+    res.json({
+      data: result,
+      total: total,
+      page: page,
+      totalPages: Math.ceil(total / limit),
+    });
+  } catch (err) {
+    console.log(err);
+    res.status(500).json({ error: err.message });
+  }
+};
+exports.readCountiesFromID = async (req, res) => {
+  try {
+    const result = await Counties.findById(req.params.id);
+    res.send(result);
+  } catch (err) {
+    console.log(err);
+    res.json({ app: err });
+  }
+};
+exports.updateCounties = async (req, res) => {
+  try {
+    const result = await Counties.findByIdAndUpdate(
+      req.params.id,
+      countyFields(req.body),
+      { new: true }
+    );
+    res.send(result);
+  } catch (err) {
+    console.log(err);
+    res.json({ app: err });
+  }
+};
+exports.deleteCounties = async (req, res) => {
+  try {
+    const result = await Counties.findByIdAndRemove(req.params.id);
+    if (!result) {
+      res.json({ app: "post not found" });
+    } else {
+      res.json({ app: "post deleted" });
+    }
+  } catch (err) {
+    console.log(err);
+    res.json({ app: err });
+  }
+};
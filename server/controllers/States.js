@@ -18,6 +18,7 @@ exports.createStates = async (req, res) => {
       ViolentCrimes: req.body.ViolentCrimes,
       PoliticalLeaning: req.body.PoliticalLeaning,
       Name: req.body.Name,
+      AffordabilityScore: req.body.AffordabilityScore,
     });
     await newStates.save();
     res.send(newStates);
@@ -25,6 +26,50 @@ exports.createStates = async (req, res) => {
     console.log(err);
   }
 };
+exports.bulkUpsertStates = async (req, res) => {
+  try {
+    const states = Array.isArray(req.body.states) ? req.body.states : [];
+    const operations = states.map((state) => ({
+      updateOne: {
+        filter: { Name: state.Name },
+        update: {
+          $set: {
+            MedianHomePrice: state.MedianHomePrice,
+            CapitalGainsTax: state.CapitalGainsTax,
+            IncomeTax: state.IncomeTax,
+            SalesTax: state.SalesTax,
+            PropertyTaxes: state.PropertyTaxes,
+            Abortion: state.Abortion,
+            CostOfLiving: state.CostOfLiving,
+            K12SchoolPerformance: state.K12SchoolPerformance,
+            HigherEdSchoolPerformance: state.HigherEdSchoolPerformance,
+            ForestedLand: state.ForestedLand,
+            GunLaws: state.GunLaws,
+            MinimumWage: state.MinimumWage,
+            Population: state.Population,
+            ViolentCrimes: state.ViolentCrimes,
+            PoliticalLeaning: state.PoliticalLeaning,
+            Name: state.Name,
+            AffordabilityScore: state.AffordabilityScore,
+          },
+        },
+        upsert: true,
+      },
+    }));
+    if (operations.length === 0) {
+      return res.json({ matched: 0, modified: 0, upserted: 0 });
+    }
+    const result = await States.bulkWrite(operations, { ordered: false });
+    res.json({
+      matched: result.matchedCount,
+      modified: result.modifiedCount,
+      upserted: result.upsertedCount,
+    });
+  } catch (err) {
+    console.log(err);
+    res.status(500).json({ error: err.message });
+  }
+};
 exports.readStates = async (req, res) => {
   const page = parseInt(req.query.page || 0);
   const limit = parseInt(req.query.limit || 55);
@@ -67,6 +112,7 @@ exports.readStates = async (req, res) => {
       "MinimumWage",
       "Population",
       "ViolentCrimes",
+      "AffordabilityScore",
     ];
     
     numericFields.forEach((field) => {
@@ -80,57 +126,17 @@ exports.readStates = async (req, res) => {
       }
     });
     
-    let result;
+    // Affordability is precomputed at ingest time (services/add-to-db/analytics.py)
+    // and stored as the indexed AffordabilityScore field, so it sorts in the database
+    // like any other field. Lower scores are less expensive.
+    const sortField = sortBy === "Affordability" ? "AffordabilityScore" : sortBy;
+    const sortObject = {};
+    sortObject[sortField] = sortOrder === "asc" ? 1 : -1;
     
-    if (sortBy === "Affordability") {
-      // Fetch all matching records without pagination first
-      result = await States.find(query);
-      
-      // Calculate scores and sort in memory
-      result = result.map(state => {
-        const stateObj = state.toObject();
-        
-        const homePrice = parseFloat(stateObj.MedianHomePrice) || 0;
-        const costOfLiving = parseFloat(stateObj.CostOfLiving) || 0;
-        const incomeTax = parseFloat(stateObj.IncomeTax) || 0;
-        const propertyTax = parseFloat(stateObj.PropertyTaxes) || 0;
-        const salesTax = parseFloat(stateObj.SalesTax) || 0;
-        
-        // Composite Score (Higher = More Expensive)
-        // Weightings optimized to balance factors
-        // Adjusted to balance Income Tax vs Property Tax better
-        const taxScore = (incomeTax + (propertyTax * 6) + salesTax);
-        const homeScore = homePrice / 1000;
-        
-        stateObj.affordabilityScore = 
-          (costOfLiving * 2) + 
-          (homeScore * 0.5) + 
-          (taxScore * 3);
-          
-        return stateObj;
-      });
-      
-      // Sort
-      result.sort((a, b) => {
-        return sortOrder === "asc" 
-          ? a.affordabilityScore - b.affordabilityScore // Least expensive first
-          : b.affordabilityScore - a.affordabilityScore; // Most expensive first
-      });
-      
-      // Apply pagination
-      const startIndex = page * limit;
-      result = result.slice(startIndex, startIndex + limit);
-      
-    } else {
-      // Standard database sort and pagination
-      const sortObject = {};
-      sortObject[sortBy] = sortOrder === "asc" ? 1 : -1;
-      
-      result = await States.find(query)
-        .sort(sortObject)
-        .skip(page * limit)
-        .limit(limit);
-    }
+    const result = await States.find(query)
+      .sort(sortObject)
+      .skip(page * limit)
+      .limit(limit);
       
     const total = await States.countDocuments(query);
     
@@ -175,6 +181,7 @@ exports.updateStates = async (req, res) => {
         ViolentCrimes: req.body.ViolentCrimes,
         PoliticalLeaning: req.body.PoliticalLeaning,
         Name: req.body.Name,
+        AffordabilityScore: req.body.AffordabilityScore,
       },
       { new: true }
     );
@@ -59,3 +59,4 @@ app.listen(PORT, () => {
 });
 app.use("/api/States", require("./routes/States"));
 app.use("/api/States", require("./routes/States"));
+app.use("/api/Counties", require("./routes/Counties"));
@@ -0,0 +1,19 @@
+const mongoose = require("mongoose");
+const CountiesSchema = new mongoose.Schema(
+  {
+    // 5-digit state + county FIPS code, e.g. "01001"
+    Fips: { unique: true, type: String, required: [true, "Please provide Fips"] },
+    StateFips: {
+      index: true,
+      type: String,
+      required: [true, "Please provide StateFips"],
+    },
+    State: { type: String, required: [true, "Please provide State"] },
+    County: { type: String, required: [true, "Please provide County"] },
+    SalesTax: { type: Number },
+    PropertyTaxes: { type: Number },
+  },
+  { timestamps: true }
+);
+const Counties = mongoose.model("Counties", CountiesSchema);
+module.exports = Counties;
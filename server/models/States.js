@@ -2,34 +2,34 @@ const mongoose = require("mongoose");
 const StatesSchema = new mongoose.Schema(
   {
     MedianHomePrice: {
-      type: String,
+      type: Number,
       required: [true, "Please provide MedianHomePrice"],
     },
     CapitalGainsTax: {
-      type: String,
+      type: Number,
       required: [true, "Please provide CapitalGainsTax"],
     },
-    IncomeTax: { type: String, required: [true, "Please provide IncomeTax"] },
-    SalesTax: { type: String, required: [true, "Please provide SalesTax"] },
+    IncomeTax: { type: Number, required: [true, "Please provide IncomeTax"] },
+    SalesTax: { type: Number, required: [true, "Please provide SalesTax"] },
     PropertyTaxes: {
-      type: String,
+      type: Number,
       required: [true, "Please provide PropertyTaxes"],
     },
     Abortion: { type: String, required: [true, "Please provide Abortion"] },
     CostOfLiving: {
-      type: String,
+      type: Number,
       required: [true, "Please provide CostOfLiving"],
     },
     K12SchoolPerformance: {
-      type: String,
+      type: Number,
       required: [true, "Please provide K12SchoolPerformance"],
     },
     HigherEdSchoolPerformance: {
-      type: String,
+      type: Number,
       required: [true, "Please provide HigherEdSchoolPerformance"],
     },
     ForestedLand: {
-      type: String,
+      type: Number,
       required: [true, "Please provide ForestedLand"],
     },
     GunLaws: { type: String, required: [true, "Please provide GunLaws"] },
@@ -37,9 +37,9 @@ const StatesSchema = new mongoose.Schema(
       type: String,
       required: [true, "Please provide MinimumWage"],
     },
-    Population: { type: String, required: [true, "Please provide Population"] },
+    Population: { type: Number, required: [true, "Please provide Population"] },
     ViolentCrimes: {
-      type: String,
+      type: Number,
       required: [true, "Please provide ViolentCrimes"],
     },
     PoliticalLeaning: {
@@ -47,6 +47,8 @@ const StatesSchema = new mongoose.Schema(
       required: [true, "Please provide PoliticalLeaning"],
     },
     Name: { unique: true, type: String, required: [true, "Please provide Name"] },
+    // Computed by the ingest tool; higher is more expensive
+    AffordabilityScore: { type: Number, index: true },
   },
   { timestamps: true }
 );
@@ -0,0 +1,17 @@
+const express = require("express");
+const router = express.Router();
+const {
+  createCounties,
+  bulkUpsertCounties,
+  readCounties,
+  readCountiesFromID,
+  updateCounties,
+  deleteCounties,
+} = require("../controllers/Counties");
+router.route("/create").post(createCounties);
+router.route("/bulk").post(bulkUpsertCounties);
+router.route("/read").get(readCounties);
+router.route("/read/:id").get(readCountiesFromID);
+router.route("/update/:id").post(updateCounties);
+router.route("/delete/:id").delete(deleteCounties);
+module.exports = router;
@@ -2,12 +2,14 @@ const express = require("express");
 const router = express.Router();
 const {
   createStates,
+  bulkUpsertStates,
   readStates,
   readStatesFromID,
   updateStates,
   deleteStates,
 } = require("../controllers/States");
 router.route("/create").post(createStates);
+router.route("/bulk").post(bulkUpsertStates);
 router.route("/read").get(readStates);
 router.route("/read/:id").get(readStatesFromID);
 router.route("/update/:id").post(updateStates);
@@ -1,133 +1,247 @@
 #!/usr/bin/env python3
 
 import os
+import argparse
 import pandas as pd
-import requests
 import glob
 import json
-from time import sleep
+
+from api_client import StatesApiClient
+from sync import plan_sync
+from manifest import Manifest, records_hash
+from sheet_cache import SheetCache
+from loader import load_workbooks
+from sources import SOURCES, build_state_records
+from sheet_reader import iter_frames
+from validation import (EarlierRows, ValidationReport, records_from_frame, validate_frame,
+                        validate_records)
+from journal import Journal, send_with_journal
+from metrics import METRICS, profiled
+from snapshot import SNAPSHOT_DIR, write_snapshot
+from county import build_county_records, validate_counties
+from brackets import load_brackets, write_brackets
+from analytics import add_affordability_scores
+from moving import compute_moving_costs, write_moving_costs
+from compare import compute_comparisons, write_comparisons
+from ranking import write_rankings
+from similar import write_similar
 
 # Configuration
 BASE_URL = "http://localhost:3002/api"
-CREATE_URL = f"{BASE_URL}/States/create"
-GET_ALL_URL = f"{BASE_URL}/States"
-UPDATE_URL = f"{BASE_URL}/States/update"
-EXCEL_DIR = "./data"  # Directory containing Excel files
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+EXCEL_DIR = os.path.join(SCRIPT_DIR, "state-info")  # Directory containing Excel files
+EXCEL_PATTERNS = ["*.xlsx", "*.xls", "*.ods"]
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".ingest-cache")
+MANIFEST_PATH = os.path.join(CACHE_DIR, "manifest.json")
+# The workbooks in sources.py as of the last complete --sync
+SOURCES_MANIFEST_PATH = os.path.join(CACHE_DIR, "sources-manifest.json")
+SHEET_CACHE_DIR = os.path.join(CACHE_DIR, "sheets")
+JOURNAL_PATH = os.path.join(CACHE_DIR, "journal.jsonl")
+COUNTY_JOURNAL_PATH = os.path.join(CACHE_DIR, "county-journal.jsonl")
+RETRIES = 3  # Extra rounds for records that failed to send
+BATCH_SIZE = 25  # Records per bulk request (1 disables bulk requests)
+CONCURRENCY = 8  # Maximum requests in flight at once
+STREAM_BATCH_SIZE = 1000  # Rows per batch when streaming large spreadsheets
+# Checked after FIELD_MAPPING, so these are the States model's field names
 REQUIRED_FIELDS = [
     "MedianHomePrice", "CapitalGainsTax", "IncomeTax", "SalesTax", 
-    "PropertyTax", "Abortion", "CostOfLiving", "K12SchoolPerformance", 
-    "HigherEdPerformance", "ForestedLand", "GunLaws", "MinimumWage", 
-    "Population", "VoilentCrimes", "PoliticalLeaning"
+    "PropertyTaxes", "Abortion", "CostOfLiving", "K12SchoolPerformance", 
+    "HigherEdSchoolPerformance", "ForestedLand", "GunLaws", "MinimumWage", 
+    "Population", "ViolentCrimes", "PoliticalLeaning", "Name"
 ]
 
-# State data
-STATE_DATA = {
-    "Alabama": {"name": "Alabama", "MedianHomePrice": "221490.00", "CapitalGainsTax": "5.00", "IncomeTax": "5.00", "Abortion": "F", "CostOfLiving": "88.0", "K12SchoolPerformance": "47", "HigherEdPerformance": "45", "ForestCoverage": "70.57", "GunLaws": "F", "MinimumWage": "7.25", "Population": "5030053", "PropertyTax": "0.40", "SalesTax": "9.00", "ViolentCrime": "403.9", "PoliticalLeaning": "Dark Red"},
-    "Alaska": {"name": "Alaska", "MedianHomePrice": "349502.00", "CapitalGainsTax": "0.00", "IncomeTax": "0.00", "Abortion": "B", "CostOfLiving": "123.8", "K12SchoolPerformance": "33", "HigherEdPerformance": "5", "ForestCoverage": "35.16", "GunLaws": "F", "MinimumWage": "11.91", "Population": "736081", "PropertyTax": "1.04", "SalesTax": "1.81", "ViolentCrime": "726.3", "PoliticalLeaning": "Dark Red"},
-    "Arizona": {"name": "Arizona", "MedianHomePrice": "426680.00", "CapitalGainsTax": "2.50", "IncomeTax": "2.50", "Abortion": "C", "CostOfLiving": "111.5", "K12SchoolPerformance": "40", "HigherEdPerformance": "43", "ForestCoverage": "25.64", "GunLaws": "F", "MinimumWage": "14.70", "Population": "7158923", "PropertyTax": "0.63", "SalesTax": "8.38", "ViolentCrime": "408.8", "PoliticalLeaning": "Purple"},
-    "Arkansas": {"name": "Arkansas", "MedianHomePrice": "198838.00", "CapitalGainsTax": "3.90", "IncomeTax": "4.40", "Abortion": "F", "CostOfLiving": "88.7", "K12SchoolPerformance": "42", "HigherEdPerformance": "30", "ForestCoverage": "56.31", "GunLaws": "F", "MinimumWage": "11.00", "Population": "3013756", "PropertyTax": "0.66", "SalesTax": "9.46", "ViolentCrime": "619.9", "PoliticalLeaning": "Dark Red"},
-    "California": {"name": "California", "MedianHomePrice": "765197.00", "CapitalGainsTax": "13.30", "IncomeTax": "13.30", "Abortion": "A", "CostOfLiving": "144.8", "K12SchoolPerformance": "41", "HigherEdPerformance": "2", "ForestCoverage": "32.71", "GunLaws": "A", "MinimumWage": "16.50", "Population": "39576757", "PropertyTax": "0.74", "SalesTax": "9.11", "ViolentCrime": "508.2", "PoliticalLeaning": "Dark Blue"},
-    "Colorado": {"name": "Colorado", "MedianHomePrice": "539151.00", "CapitalGainsTax": "4.40", "IncomeTax": "4.40", "Abortion": "A", "CostOfLiving": "102.0", "K12SchoolPerformance": "17", "HigherEdPerformance": "28", "ForestCoverage": "34.42", "GunLaws": "A-", "MinimumWage": "14.81", "Population": "5782171", "PropertyTax": "0.51", "SalesTax": "7.83", "ViolentCrime": "474.0", "PoliticalLeaning": "Light Blue"},
-    "Connecticut": {"name": "Connecticut", "MedianHomePrice": "384244.00", "CapitalGainsTax": "6.99", "IncomeTax": "6.99", "Abortion": "A", "CostOfLiving": "112.3", "K12SchoolPerformance": "18", "HigherEdPerformance": "24", "ForestCoverage": "55.24", "GunLaws": "A", "MinimumWage": "16.35", "Population": "3608298", "PropertyTax": "1.73", "SalesTax": "6.35", "ViolentCrime": "150.2", "PoliticalLeaning": "Dark Blue"},
-    "Delaware": {"name": "Delaware", "MedianHomePrice": "374252.00", "CapitalGainsTax": "6.60", "IncomeTax": "6.60", "Abortion": "A", "CostOfLiving": "100.8", "K12SchoolPerformance": "38", "HigherEdPerformance": "17", "ForestCoverage": "27.26", "GunLaws": "A-", "MinimumWage": "15.00", "Population": "990837", "PropertyTax": "0.59", "SalesTax": "0.00", "ViolentCrime": "380.2", "PoliticalLeaning": "Dark Blue"},
-    "District of Columbia": {"name": "District of Columbia", "MedianHomePrice": "610548.00", "CapitalGainsTax": "10.75", "IncomeTax": "10.75", "Abortion": "A", "CostOfLiving": "141.9", "K12SchoolPerformance": "34", "HigherEdPerformance": "42", "ForestCoverage": "33.90", "GunLaws": "A", "MinimumWage": "17.50", "Population": "705749", "PropertyTax": "0.56", "SalesTax": "6.00", "ViolentCrime": "1150.9", "PoliticalLeaning": "Dark Blue"},
-    "Florida": {"name": "Florida", "MedianHomePrice": "392306.00", "CapitalGainsTax": "0.00", "IncomeTax": "0.00", "Abortion": "C", "CostOfLiving": "102.8", "K12SchoolPerformance": "37", "HigherEdPerformance": "1", "ForestCoverage": "50.68", "GunLaws": "C-", "MinimumWage": "13.00", "Population": "21570527", "PropertyTax": "0.86", "SalesTax": "7.04", "ViolentCrime": "290.2", "PoliticalLeaning": "Light Red"},
-    "Georgia": {"name": "Georgia", "MedianHomePrice": "321821.00", "CapitalGainsTax": "5.39", "IncomeTax": "5.49", "Abortion": "C", "CostOfLiving": "91.3", "K12SchoolPerformance": "36", "HigherEdPerformance": "3", "ForestCoverage": "67.28", "GunLaws": "F", "MinimumWage": "5.15", "Population": "10725274", "PropertyTax": "0.91", "SalesTax": "7.41", "ViolentCrime": "351.8", "PoliticalLeaning": "Purple"},
-    "Hawaii": {"name": "Hawaii", "MedianHomePrice": "839013.00", "CapitalGainsTax": "7.25", "IncomeTax": "11.00", "Abortion": "A", "CostOfLiving": "186.9", "K12SchoolPerformance": "24", "HigherEdPerformance": "20", "ForestCoverage": "42.53", "GunLaws": "A-", "MinimumWage": "14.00", "Population": "1460137", "PropertyTax": "0.31", "SalesTax": "4.44", "ViolentCrime": "187.1", "PoliticalLeaning": "Dark Blue"},
-    "Idaho": {"name": "Idaho", "MedianHomePrice": "443500.00", "CapitalGainsTax": "5.69", "IncomeTax": "5.80", "Abortion": "F", "CostOfLiving": "102.0", "K12SchoolPerformance": "21", "HigherEdPerformance": "39", "ForestCoverage": "40.55", "GunLaws": "F", "MinimumWage": "7.25", "Population": "1841377", "PropertyTax": "0.66", "SalesTax": "6.02", "ViolentCrime": "234.0", "PoliticalLeaning": "Dark Red"},
-    "Illinois": {"name": "Illinois", "MedianHomePrice": "251267.00", "CapitalGainsTax": "4.95", "IncomeTax": "4.95", "Abortion": "A", "CostOfLiving": "94.4", "K12SchoolPerformance": "22", "HigherEdPerformance": "6", "ForestCoverage": "13.64", "GunLaws": "A-", "MinimumWage": "15.00", "Population": "12822739", "PropertyTax": "2.16", "SalesTax": "8.86", "ViolentCrime": "310.1", "PoliticalLeaning": "Dark Blue"},
-    "Indiana": {"name": "Indiana", "MedianHomePrice": "231533.00", "CapitalGainsTax": "3.00", "IncomeTax": "3.15", "Abortion": "F", "CostOfLiving": "90.5", "K12SchoolPerformance": "23", "HigherEdPerformance": "25", "ForestCoverage": "21.06", "GunLaws": "D-", "MinimumWage": "7.25", "Population": "6790280", "PropertyTax": "0.81", "SalesTax": "7.00", "ViolentCrime": "332.2", "PoliticalLeaning": "Light Red"},
-    "Iowa": {"name": "Iowa", "MedianHomePrice": "208755.00", "CapitalGainsTax": "3.80", "IncomeTax": "5.70", "Abortion": "C", "CostOfLiving": "89.7", "K12SchoolPerformance": "12", "HigherEdPerformance": "26", "ForestCoverage": "8.43", "GunLaws": "F", "MinimumWage": "7.25", "Population": "3192406", "PropertyTax": "1.38", "SalesTax": "6.94", "ViolentCrime": "279.9", "PoliticalLeaning": "Light Red"},
-    "Kansas": {"name": "Kansas", "MedianHomePrice": "217315.00", "CapitalGainsTax": "5.58", "IncomeTax": "5.70", "Abortion": "B", "CostOfLiving": "87.0", "K12SchoolPerformance": "20", "HigherEdPerformance": "34", "ForestCoverage": "4.78", "GunLaws": "F", "MinimumWage": "7.25", "Population": "2940865", "PropertyTax": "1.28", "SalesTax": "8.72", "ViolentCrime": "429.7", "PoliticalLeaning": "Dark Red"},
-    "Kentucky": {"name": "Kentucky", "MedianHomePrice": "196550.00", "CapitalGainsTax": "4.00", "IncomeTax": "4.50", "Abortion": "F", "CostOfLiving": "93.0", "K12SchoolPerformance": "39", "HigherEdPerformance": "15", "ForestCoverage": "49.35", "GunLaws": "F", "MinimumWage": "7.25", "Population": "4509342", "PropertyTax": "0.78", "SalesTax": "6.00", "ViolentCrime": "224.3", "PoliticalLeaning": "Dark Red"},
-    "Louisiana": {"name": "Louisiana", "MedianHomePrice": "194308.00", "CapitalGainsTax": "3.00", "IncomeTax": "4.25", "Abortion": "F", "CostOfLiving": "92.2", "K12SchoolPerformance": "45", "HigherEdPerformance": "22", "ForestCoverage": "53.20", "GunLaws": "F", "MinimumWage": "No state law", "Population": "4661468", "PropertyTax": "0.52", "SalesTax": "9.56", "ViolentCrime": "548.0", "PoliticalLeaning": "Dark Red"},
-    "Maine": {"name": "Maine", "MedianHomePrice": "382580.00", "CapitalGainsTax": "7.15", "IncomeTax": "7.15", "Abortion": "A", "CostOfLiving": "112.1", "K12SchoolPerformance": "14", "HigherEdPerformance": "46", "ForestCoverage": "89.46", "GunLaws": "C+", "MinimumWage": "14.65", "Population": "1363582", "PropertyTax": "1.12", "SalesTax": "5.50", "ViolentCrime": "102.5", "PoliticalLeaning": "Light Blue"},
-    "Maryland": {"name": "Maryland", "MedianHomePrice": "406843.00", "CapitalGainsTax": "5.75", "IncomeTax": "5.75", "Abortion": "A", "CostOfLiving": "115.3", "K12SchoolPerformance": "28", "HigherEdPerformance": "18", "ForestCoverage": "39.36", "GunLaws": "A-", "MinimumWage": "15.00", "Population": "6185278", "PropertyTax": "1.03", "SalesTax": "6.00", "ViolentCrime": "426.2", "PoliticalLeaning": "Dark Blue"},
-    "Massachusetts": {"name": "Massachusetts", "MedianHomePrice": "596410.00", "CapitalGainsTax": "9.00", "IncomeTax": "5.00", "Abortion": "A", "CostOfLiving": "145.9", "K12SchoolPerformance": "1", "HigherEdPerformance": "38", "ForestCoverage": "60.57", "GunLaws": "A", "MinimumWage": "15.00", "Population": "7033469", "PropertyTax": "1.52", "SalesTax": "6.25", "ViolentCrime": "314.2", "PoliticalLeaning": "Dark Blue"},
-    "Michigan": {"name": "Michigan", "MedianHomePrice": "232511.00", "CapitalGainsTax": "4.25", "IncomeTax": "4.25", "Abortion": "A", "CostOfLiving": "90.4", "K12SchoolPerformance": "26", "HigherEdPerformance": "41", "ForestCoverage": "55.62", "GunLaws": "B-", "MinimumWage": "10.56", "Population": "10084442", "PropertyTax": "1.44", "SalesTax": "6.00", "ViolentCrime": "457.2", "PoliticalLeaning": "Purple"},
-    "Minnesota": {"name": "Minnesota", "MedianHomePrice": "323034.00", "CapitalGainsTax": "9.85", "IncomeTax": "9.85", "Abortion": "A", "CostOfLiving": "95.1", "K12SchoolPerformance": "8", "HigherEdPerformance": "27", "ForestCoverage": "34.08", "GunLaws": "B", "MinimumWage": "11.13", "Population": "5709752", "PropertyTax": "1.08", "SalesTax": "7.56", "ViolentCrime": "261.1", "PoliticalLeaning": "Light Blue"},
-    "Mississippi": {"name": "Mississippi", "MedianHomePrice": "171613.00", "CapitalGainsTax": "4.40", "IncomeTax": "4.70", "Abortion": "F", "CostOfLiving": "87.9", "K12SchoolPerformance": "46", "HigherEdPerformance": "32", "ForestCoverage": "65.07", "GunLaws": "F", "MinimumWage": "No state law", "Population": "2963914", "PropertyTax": "0.69", "SalesTax": "7.07", "ViolentCrime": "202.8", "PoliticalLeaning": "Dark Red"},
-    "Missouri": {"name": "Missouri", "MedianHomePrice": "238125.00", "CapitalGainsTax": "4.70", "IncomeTax": "4.95", "Abortion": "F", "CostOfLiving": "88.7", "K12SchoolPerformance": "27", "HigherEdPerformance": "29", "ForestCoverage": "35.16", "GunLaws": "F", "MinimumWage": "13.75", "Population": "6160281", "PropertyTax": "0.88", "SalesTax": "8.42", "ViolentCrime": "458.7", "PoliticalLeaning": "Dark Red"},
-    "Montana": {"name": "Montana", "MedianHomePrice": "448238.00", "CapitalGainsTax": "5.90", "IncomeTax": "5.90", "Abortion": "B", "CostOfLiving": "94.9", "K12SchoolPerformance": "13", "HigherEdPerformance": "49", "ForestCoverage": "27.45", "GunLaws": "F", "MinimumWage": "10.55", "Population": "1085407", "PropertyTax": "0.75", "SalesTax": "0.00", "ViolentCrime": "442.0", "PoliticalLeaning": "Dark Red"},
-    "Nebraska": {"name": "Nebraska", "MedianHomePrice": "251315.00", "CapitalGainsTax": "5.20", "IncomeTax": "5.84", "Abortion": "C", "CostOfLiving": "93.1", "K12SchoolPerformance": "15", "HigherEdPerformance": "23", "ForestCoverage": "3.20", "GunLaws": "C-", "MinimumWage": "13.50", "Population": "1963333", "PropertyTax": "1.73", "SalesTax": "6.99", "ViolentCrime": "229.7", "PoliticalLeaning": "Dark Red"},
-    "Nevada": {"name": "Nevada", "MedianHomePrice": "426267.00", "CapitalGainsTax": "0.00", "IncomeTax": "0.00", "Abortion": "A", "CostOfLiving": "101.3", "K12SchoolPerformance": "44", "HigherEdPerformance": "16", "ForestCoverage": "15.89", "GunLaws": "B-", "MinimumWage": "12.00", "Population": "3108462", "PropertyTax": "0.60", "SalesTax": "8.24", "ViolentCrime": "416.8", "PoliticalLeaning": "Purple"},
-    "New Hampshire": {"name": "New Hampshire", "MedianHomePrice": "454948.00", "CapitalGainsTax": "0.00", "IncomeTax": "4.00", "Abortion": "B", "CostOfLiving": "112.6", "K12SchoolPerformance": "2", "HigherEdPerformance": "51", "ForestCoverage": "84.32", "GunLaws": "D-", "MinimumWage": "7.25", "Population": "1379089", "PropertyTax": "2.10", "SalesTax": "0.00", "ViolentCrime": "107.2", "PoliticalLeaning": "Light Blue"},
-    "New Jersey": {"name": "New Jersey", "MedianHomePrice": "503432.00", "CapitalGainsTax": "10.75", "IncomeTax": "10.75", "Abortion": "A", "CostOfLiving": "114.6", "K12SchoolPerformance": "11", "HigherEdPerformance": "13", "ForestCoverage": "41.72", "GunLaws": "A", "MinimumWage": "15.49", "Population": "9294493", "PropertyTax": "2.42", "SalesTax": "6.60", "ViolentCrime": "221.3", "PoliticalLeaning": "Dark Blue"},
-    "New Mexico": {"name": "New Mexico", "MedianHomePrice": "292280.00", "CapitalGainsTax": "5.90", "IncomeTax": "5.90", "Abortion": "A", "CostOfLiving": "93.3", "K12SchoolPerformance": "51", "HigherEdPerformance": "8", "ForestCoverage": "31.99", "GunLaws": "B-", "MinimumWage": "12.00", "Population": "2120220", "PropertyTax": "0.68", "SalesTax": "7.60", "ViolentCrime": "749.3", "PoliticalLeaning": "Light Blue"},
-    "New York": {"name": "New York", "MedianHomePrice": "453138.00", "CapitalGainsTax": "10.90", "IncomeTax": "10.90", "Abortion": "A", "CostOfLiving": "123.3", "K12SchoolPerformance": "31", "HigherEdPerformance": "12", "ForestCoverage": "62.88", "GunLaws": "A", "MinimumWage": "16.50", "Population": "20215751", "PropertyTax": "1.58", "SalesTax": "8.53", "ViolentCrime": "389.8", "PoliticalLeaning": "Dark Blue"},
-    "North Carolina": {"name": "North Carolina", "MedianHomePrice": "322527.00", "CapitalGainsTax": "4.25", "IncomeTax": "4.50", "Abortion": "C", "CostOfLiving": "97.8", "K12SchoolPerformance": "35", "HigherEdPerformance": "7", "ForestCoverage": "59.73", "GunLaws": "C-", "MinimumWage": "7.25", "Population": "10453948", "PropertyTax": "0.78", "SalesTax": "6.99", "ViolentCrime": "391.4", "PoliticalLeaning": "Purple"},
-    "North Dakota": {"name": "North Dakota", "MedianHomePrice": "248022.00", "CapitalGainsTax": "2.50", "IncomeTax": "2.50", "Abortion": "F", "CostOfLiving": "91.9", "K12SchoolPerformance": "7", "HigherEdPerformance": "35", "ForestCoverage": "1.72", "GunLaws": "F", "MinimumWage": "7.25", "Population": "779702", "PropertyTax": "0.94", "SalesTax": "6.97", "ViolentCrime": "267.4", "PoliticalLeaning": "Dark Red"},
-    "Ohio": {"name": "Ohio", "MedianHomePrice": "217698.00", "CapitalGainsTax": "3.50", "IncomeTax": "3.50", "Abortion": "C", "CostOfLiving": "94.2", "K12SchoolPerformance": "25", "HigherEdPerformance": "48", "ForestCoverage": "30.92", "GunLaws": "D-", "MinimumWage": "10.70", "Population": "11808848", "PropertyTax": "1.52", "SalesTax": "7.25", "ViolentCrime": "286.5", "PoliticalLeaning": "Light Red"},
-    "Oklahoma": {"name": "Oklahoma", "MedianHomePrice": "199378.00", "CapitalGainsTax": "4.75", "IncomeTax": "4.75", "Abortion": "F", "CostOfLiving": "85.7", "K12SchoolPerformance": "49", "HigherEdPerformance": "36", "ForestCoverage": "28.80", "GunLaws": "F", "MinimumWage": "7.25", "Population": "3963516", "PropertyTax": "0.91", "SalesTax": "8.99", "ViolentCrime": "413.7", "PoliticalLeaning": "Dark Red"},
-    "Oregon": {"name": "Oregon", "MedianHomePrice": "487244.00", "CapitalGainsTax": "9.90", "IncomeTax": "9.90", "Abortion": "A", "CostOfLiving": "112.0", "K12SchoolPerformance": "29", "HigherEdPerformance": "37", "ForestCoverage": "48.51", "GunLaws": "A-", "MinimumWage": "15.95", "Population": "4241500", "PropertyTax": "0.90", "SalesTax": "0.00", "ViolentCrime": "326.3", "PoliticalLeaning": "Dark Blue"},
-    "Pennsylvania": {"name": "Pennsylvania", "MedianHomePrice": "255570.00", "CapitalGainsTax": "3.07", "IncomeTax": "3.07", "Abortion": "B", "CostOfLiving": "95.1", "K12SchoolPerformance": "3", "HigherEdPerformance": "44", "ForestCoverage": "58.60", "GunLaws": "B", "MinimumWage": "7.25", "Population": "13011844", "PropertyTax": "1.50", "SalesTax": "6.34", "ViolentCrime": "266.4", "PoliticalLeaning": "Purple"},
-    "Rhode Island": {"name": "Rhode Island", "MedianHomePrice": "438711.00", "CapitalGainsTax": "5.99", "IncomeTax": "5.99", "Abortion": "A", "CostOfLiving": "112.2", "K12SchoolPerformance": "32", "HigherEdPerformance": "47", "ForestCoverage": "54.38", "GunLaws": "A-", "MinimumWage": "15.00", "Population": "1098163", "PropertyTax": "1.53", "SalesTax": "7.00", "ViolentCrime": "167.8", "PoliticalLeaning": "Dark Blue"},
-    "South Carolina": {"name": "South Carolina", "MedianHomePrice": "287882.00", "CapitalGainsTax": "6.20", "IncomeTax": "6.40", "Abortion": "C", "CostOfLiving": "95.9", "K12SchoolPerformance": "43", "HigherEdPerformance": "10", "ForestCoverage": "68.19", "GunLaws": "F", "MinimumWage": "No state law", "Population": "5124712", "PropertyTax": "0.54", "SalesTax": "7.50", "ViolentCrime": "471.0", "PoliticalLeaning": "Dark Red"},
-    "South Dakota": {"name": "South Dakota", "MedianHomePrice": "292551.00", "CapitalGainsTax": "0.00", "IncomeTax": "0.00", "Abortion": "F", "CostOfLiving": "92.2", "K12SchoolPerformance": "9", "HigherEdPerformance": "33", "ForestCoverage": "3.93", "GunLaws": "F", "MinimumWage": "11.50", "Population": "887770", "PropertyTax": "1.14", "SalesTax": "6.04", "ViolentCrime": "349.7", "PoliticalLeaning": "Dark Red"},
-    "Tennessee": {"name": "Tennessee", "MedianHomePrice": "311531.00", "CapitalGainsTax": "0.00", "IncomeTax": "0.00", "Abortion": "F", "CostOfLiving": "90.5", "K12SchoolPerformance": "30", "HigherEdPerformance": "9", "ForestCoverage": "52.83", "GunLaws": "F", "MinimumWage": "No state law", "Population": "6916897", "PropertyTax": "0.68", "SalesTax": "9.55", "ViolentCrime": "628.2", "PoliticalLeaning": "Dark Red"},
-    "Texas": {"name": "Texas", "MedianHomePrice": "298624.00", "CapitalGainsTax": "0.00", "IncomeTax": "0.00", "Abortion": "F", "CostOfLiving": "92.7", "K12SchoolPerformance": "48", "HigherEdPerformance": "21", "ForestCoverage": "37.33", "GunLaws": "F", "MinimumWage": "7.25", "Population": "29183290", "PropertyTax": "1.60", "SalesTax": "8.20", "ViolentCrime": "406.0", "PoliticalLeaning": "Light Red"},
-    "Utah": {"name": "Utah", "MedianHomePrice": "509433.00", "CapitalGainsTax": "4.55", "IncomeTax": "4.65", "Abortion": "C", "CostOfLiving": "104.9", "K12SchoolPerformance": "4", "HigherEdPerformance": "40", "ForestCoverage": "34.48", "GunLaws": "F", "MinimumWage": "7.25", "Population": "3275252", "PropertyTax": "0.62", "SalesTax": "7.28", "ViolentCrime": "232.2", "PoliticalLeaning": "Dark Red"},
-    "Vermont": {"name": "Vermont", "MedianHomePrice": "373001.00", "CapitalGainsTax": "8.75", "IncomeTax": "8.75", "Abortion": "A", "CostOfLiving": "114.4", "K12SchoolPerformance": "5", "HigherEdPerformance": "50", "ForestCoverage": "77.81", "GunLaws": "B-", "MinimumWage": "14.01", "Population": "643503", "PropertyTax": "1.76", "SalesTax": "6.36", "ViolentCrime": "210.4", "PoliticalLeaning": "Dark Blue"},
-    "Virginia": {"name": "Virginia", "MedianHomePrice": "377699.00", "CapitalGainsTax": "5.75", "IncomeTax": "5.75", "Abortion": "B", "CostOfLiving": "100.7", "K12SchoolPerformance": "19", "HigherEdPerformance": "11", "ForestCoverage": "62.93", "GunLaws": "B+", "MinimumWage": "12.41", "Population": "8654542", "PropertyTax": "0.93", "SalesTax": "5.78", "ViolentCrime": "236.2", "PoliticalLeaning": "Light Blue"},
-    "Washington": {"name": "Washington", "MedianHomePrice": "575894.00", "CapitalGainsTax": "0.00", "IncomeTax": "0.00", "Abortion": "A", "CostOfLiving": "114.2", "K12SchoolPerformance": "16", "HigherEdPerformance": "4", "ForestCoverage": "52.74", "GunLaws": "A-", "MinimumWage": "16.66", "Population": "7715946", "PropertyTax": "0.92", "SalesTax": "9.31", "ViolentCrime": "357.2", "PoliticalLeaning": "Dark Blue"},
-    "West Virginia": {"name": "West Virginia", "MedianHomePrice": "155491.00", "CapitalGainsTax": "4.82", "IncomeTax": "5.12", "Abortion": "F", "CostOfLiving": "84.1", "K12SchoolPerformance": "50", "HigherEdPerformance": "31", "ForestCoverage": "79.01", "GunLaws": "F", "MinimumWage": "8.75", "Population": "1795045", "PropertyTax": "0.59", "SalesTax": "6.57", "ViolentCrime": "265.5", "PoliticalLeaning": "Dark Red"},
-    "Wisconsin": {"name": "Wisconsin", "MedianHomePrice": "286394.00", "CapitalGainsTax": "7.65", "IncomeTax": "7.65", "Abortion": "F", "CostOfLiving": "97.0", "K12SchoolPerformance": "10", "HigherEdPerformance": "19", "ForestCoverage": "48.98", "GunLaws": "C", "MinimumWage": "7.25", "Population": "5897473", "PropertyTax": "1.85", "SalesTax": "5.48", "ViolentCrime": "288.6", "PoliticalLeaning": "Purple"},
-    "Wyoming": {"name": "Wyoming", "MedianHomePrice": "334782.00", "CapitalGainsTax": "0.00", "IncomeTax": "0.00", "Abortion": "F", "CostOfLiving": "95.5", "K12SchoolPerformance": "6", "HigherEdPerformance": "14", "ForestCoverage": "18.42", "GunLaws": "F", "MinimumWage": "5.15", "Population": "577719", "PropertyTax": "0.61", "SalesTax": "5.43", "ViolentCrime": "191.1", "PoliticalLeaning": "Dark Red"}
+# Field mapping from your data to MongoDB model fields
+FIELD_MAPPING = {
+    "name": "Name",  # Case difference
+    "PropertyTax": "PropertyTaxes",
+    "HigherEdPerformance": "HigherEdSchoolPerformance",
+    "ForestCoverage": "ForestedLand",
+    "ViolentCrime": "ViolentCrimes",
+    "VoilentCrimes": "ViolentCrimes",  # Misspelt header older sheets were built with
+    # Add other mappings as needed
 }
 
-def validate_data(data):
-    """Validate that all required fields are present in the data."""
-    missing_fields = [field for field in REQUIRED_FIELDS if field not in data]
-    if missing_fields:
-        print(f"Warning: Missing required fields: {', '.join(missing_fields)}")
-        return False
-    return True
+def read_excel_file(file_path, manifest=None, cache=None):
+    """Read a spreadsheet, from the parsed-sheet cache when one is given."""
+    if cache is None:
+        return pd.read_excel(file_path)
+    content_hash = manifest.content_hash(file_path) if manifest is not None else None
+    return cache.read_excel(file_path, content_hash)
 
-def process_excel_file(file_path):
-    """Process a single Excel file and submit data to the API."""
+def process_excel_file(file_path, client, manifest=None, force=False, cache=None,
+                       stream_batch_size=None, typed=True):
+    """Process a single Excel file and submit data to the API.
+    
+    With stream_batch_size the sheet is streamed and sent that many rows at a time,
+    so memory stays flat regardless of sheet size. Cross-row rules such as duplicate
+    names still see the whole sheet. Values are sent as validated, or as the
+    historical strings with typed=False.
+    """
+    if manifest is not None and not force and manifest.is_unchanged(file_path):
+        print(f"Skipping unchanged file: {file_path}")
+        return
+    
     print(f"Processing file: {file_path}")
     try:
-        # Read Excel file
-        df = pd.read_excel(file_path)
-        
-        # For each row in the dataframe
         success_count = 0
         error_count = 0
         
-        for _, row in df.iterrows():
-            # Convert row to dictionary and clean NaN values
-            data = row.to_dict()
-            data = {k: str(v) if pd.notna(v) else "" for k, v in data.items()}
-            
-            # Validate data
-            if not validate_data(data):
-                error_count += 1
+        if stream_batch_size:
+            frames = iter_frames(file_path, batch_size=stream_batch_size)
+        else:
+            # Read Excel file
+            frames = [read_excel_file(file_path, manifest, cache)]
+        
+        parsed_hash = None
+        batch_hashes = []
+        earlier = EarlierRows()
+        report = ValidationReport(0)
+        # Streamed batches are read lazily, so time each one as it is produced
+        for df in METRICS.timed(frames, "stage_seconds", stage="read"):
+            df = df.rename(columns=FIELD_MAPPING).reset_index(drop=True)
+            with METRICS.timer("stage_seconds", stage="validate"):
+                checked, batch_report = validate_frame(df, required=REQUIRED_FIELDS,
+                                                       earlier=earlier)
+            report.extend(batch_report)
+            # Required fields are columns, so a missing one fails the whole sheet
+            if batch_report.missing_columns:
+                METRICS.count("records_total", len(df), stage="validate", outcome="invalid")
+                error_count += len(df)
                 continue
+            METRICS.count("records_total", batch_report.invalid_count, stage="validate",
+                          outcome="invalid")
+            error_count += batch_report.invalid_count
+            with METRICS.timer("stage_seconds", stage="map"):
+                records = records_from_frame(checked[~batch_report.invalid], typed)
+            add_affordability_scores(records)
             
-            # Send data to API
-            try:
-                response = requests.post(CREATE_URL, json=data)
-                if response.status_code == 200:
-                    success_count += 1
-                else:
-                    print(f"API Error: {response.status_code} - {response.text}")
-                    error_count += 1
-                
-                # Small delay to avoid overwhelming the server
-                sleep(0.1)
-                
-            except requests.RequestException as e:
-                print(f"Request error: {str(e)}")
-                error_count += 1
+            if stream_batch_size:
+                batch_hashes.append(records_hash(records))
+            else:
+                # A re-saved file can have new bytes but the same data
+                parsed_hash = records_hash(records)
+                if (manifest is not None and not force
+                        and manifest.records_unchanged(file_path, parsed_hash)):
+                    print(f"Records unchanged in {file_path}, nothing to send")
+                    manifest.update(file_path, parsed_hash)
+                    manifest.save()
+                    return
+            
+            # Send data to API in batches
+            with METRICS.timer("stage_seconds", stage="send"):
+                for _, ok, detail in client.send(records):
+                    METRICS.count("records_total", stage="send", outcome="ok" if ok else "failed")
+                    if ok:
+                        success_count += 1
+                    else:
+                        print(f"API Error: {detail}")
+                        error_count += 1
         
+        if stream_batch_size:
+            # Batches are never held together, so hash their hashes instead
+            parsed_hash = records_hash(batch_hashes)
+        report.print_report()
         print(f"Processed {success_count + error_count} records:")
         print(f"  - {success_count} successful")
         print(f"  - {error_count} failed")
         
+        # Only remember files that went through cleanly, so failures are retried
+        if manifest is not None and error_count == 0:
+            manifest.update(file_path, parsed_hash)
+            manifest.save()
+        
     except Exception as e:
         print(f"Error processing file {file_path}: {str(e)}")
 
-def send_state_data_to_api():
+def list_excel_files(excel_dir):
+    """Return the spreadsheets in excel_dir, sorted by name."""
+    files = []
+    for pattern in EXCEL_PATTERNS:
+        files.extend(glob.glob(os.path.join(excel_dir, pattern)))
+    return sorted(files)
+
+def prune_sheet_cache(excel_dir):
+    """Drop cached sheets that no spreadsheet in excel_dir has any more."""
+    removed = SheetCache(SHEET_CACHE_DIR).prune(list_excel_files(excel_dir))
+    if removed:
+        print(f"Removed {removed} stale files from the sheet cache")
+
+def process_excel_dir(excel_dir, client, manifest=None, force=False, cache=None,
+                      stream_batch_size=None, typed=True):
+    """Process every spreadsheet in a directory, skipping ones that haven't changed."""
+    for file_path in list_excel_files(excel_dir):
+        process_excel_file(file_path, client, manifest, force, cache, stream_batch_size,
+                           typed)
+
+def load_state_records(source_dir, workers=None, cache_dir=None, typed=True,
+                       report_path=None):
+    """Build the state records from the source workbooks listed in sources.py.
+    
+    Values are typed and range checked once here; typed=False converts them back
+    to the strings older servers stored. The validation report is printed, and
+    also written to report_path as JSON when one is given. Derived fields such as
+    AffordabilityScore are filled in last. Returns None, so nothing is sent, when a
+    source failed or left a required field empty for every state.
+    """
+    print(f"Reading state data from {source_dir}...")
+    records, failed = build_state_records(source_dir, workers=workers, cache_dir=cache_dir)
+    records, report = validate_records(records, typed=typed)
+    report.print_report()
+    if report_path:
+        report.write(report_path)
+    # Sending what's left would upsert incomplete states and skew the derived scores
+    if failed:
+        print(f"Not sending states: {len(failed)} sources failed ({', '.join(failed)})")
+        return None
+    if report.missing_columns:
+        print(f"Not sending states: no values for {', '.join(report.missing_columns)}")
+        return None
+    add_affordability_scores(records)
+    return records
+
+def source_paths(source_dir):
+    """Paths of the workbooks listed in sources.py."""
+    return [os.path.join(source_dir, source.filename) for source in SOURCES]
+
+def state_sources_unchanged(manifest, source_dir):
+    """True if every workbook in sources.py is as it was at the last complete sync."""
+    return all(os.path.exists(path) and manifest.is_unchanged(path)
+               for path in source_paths(source_dir))
+
+def record_state_sources(manifest, source_dir, records):
+    """Mark the workbooks as synced, with the hash of the records built from them."""
+    parsed_hash = records_hash(records)
+    for path in source_paths(source_dir):
+        manifest.update(path, parsed_hash)
+    manifest.save()
+
+def load_county_records(source_dir, workers=None, report_path=None):
+    """Build and validate the county records from the workbooks listed in county.py."""
+    print(f"Reading county data from {source_dir}...")
+    records = build_county_records(source_dir, workers=workers)
+    records, report = validate_counties(records)
+    report.print_report()
+    if report_path:
+        report.write(report_path)
+    return records
+
+def fetch_existing_states(client):
+    """Return {name: document} for every state already in the database.
+    
+    Returns None if they couldn't all be fetched: planning against a partial index
+    would re-create the states it is missing.
+    """
+    existing_states = {}
+    try:
+        for state in client.iter_all():
+            existing_states[state["Name"]] = state
+        print(f"Found {len(existing_states)} existing states in database")
+    except Exception as e:
+        print(f"Error getting existing states: {str(e)}")
+        return None
+    return existing_states
+
+def send_state_data_to_api(client, records, journal, retries=RETRIES):
     """Send state data to the MongoDB API, skipping states that already exist"""
     print("Sending state data to API...")
     
@@ -135,76 +249,265 @@ def send_state_data_to_api():
     skip_count = 0
     error_count = 0
     
-    # Field mapping from your data to MongoDB model fields
-    field_mapping = {
-        "name": "Name",  # Case difference
-        "PropertyTax": "PropertyTaxes",
-        "HigherEdPerformance": "HigherEdSchoolPerformance",
-        "ForestCoverage": "ForestedLand",
-        "ViolentCrime": "ViolentCrimes",
-        # Add other mappings as needed
-    }
-    
     # First, try to get all existing states from the database
-    existing_states = set()
-    try:
-        response = requests.get(GET_ALL_URL)
-        if response.status_code == 200:
-            states_list = response.json()
-            for state in states_list:
-                existing_states.add(state["Name"])
-            print(f"Found {len(existing_states)} existing states in database")
-        else:
-            print(f"Failed to get existing states: {response.status_code} - {response.text}")
-    except Exception as e:
-        print(f"Error getting existing states: {str(e)}")
+    existing_states = fetch_existing_states(client)
+    if existing_states is None:
+        print("Aborting: can't tell which states already exist")
+        return False
     
-    # Process each state
-    for state_key, state_data in STATE_DATA.items():
-        try:
-            # Create a new dictionary with the correct field names
-            mapped_data = {}
-            for key, value in state_data.items():
-                if key in field_mapping:
-                    mapped_data[field_mapping[key]] = value
-                else:
-                    mapped_data[key] = value
-            
-            # Check if this state already exists
-            state_name = mapped_data.get("Name")
-            if state_name in existing_states:
-                # State exists, skip it
-                print(f"State {state_name} already exists, skipping...")
-                skip_count += 1
-                continue
-            
-            # State doesn't exist, create new
-            print(f"Creating new state {state_name}...")
-            response = requests.post(CREATE_URL, json=mapped_data)
-            
-            # Check response
-            if response.status_code in [200, 201, 204]:
+    # Collect the states that still need creating
+    pending = []
+    for record in records:
+        state_name = record.get("Name")
+        if state_name in existing_states:
+            # State exists, skip it
+            print(f"State {state_name} already exists, skipping...")
+            skip_count += 1
+            continue
+        pending.append(record)
+    
+    # Create the new states in batches
+    print(f"Creating {len(pending)} new states...")
+    with METRICS.timer("stage_seconds", stage="send"):
+        for record, ok, detail in send_with_journal(client, pending, journal, retries):
+            METRICS.count("records_total", stage="send", outcome="ok" if ok else "failed")
+            state_name = record.get("Name")
+            if ok:
                 print(f"Successfully added {state_name}")
                 success_count += 1
             else:
-                print(f"API Error for {state_name}: {response.status_code} - {response.text}")
+                print(f"API Error for {state_name}: {detail}")
                 error_count += 1
-            
-            # Small delay to avoid overwhelming the server
-            sleep(0.1)
-            
-        except Exception as e:
-            print(f"Error processing {state_key}: {str(e)}")
-            error_count += 1
     
     print(f"Processed {success_count + skip_count + error_count} states:")
     print(f"  - {success_count} successfully added")
     print(f"  - {skip_count} skipped (already exist)")
     print(f"  - {error_count} failed")
+    return error_count == 0
 
-def main():
+def sync_state_data(client, records, journal, dry_run=False, retries=RETRIES):
+    """Create new states and update changed ones, leaving unchanged states alone"""
+    print("Syncing state data with API...")
+    
+    existing_states = fetch_existing_states(client)
+    if existing_states is None:
+        print("Aborting sync: can't tell which states already exist")
+        return False
+    plan = plan_sync(records, existing_states)
+    plan.print_report()
+    
+    if dry_run:
+        print("Dry run, nothing sent.")
+        return False
+    
+    success_count = 0
+    error_count = 0
+    with METRICS.timer("stage_seconds", stage="send"):
+        for record, ok, detail in send_with_journal(client, plan.records(), journal, retries):
+            METRICS.count("records_total", stage="send", outcome="ok" if ok else "failed")
+            state_name = record.get("Name")
+            if ok:
+                success_count += 1
+            else:
+                print(f"API Error for {state_name}: {detail}")
+                error_count += 1
+    
+    print(f"Synced {success_count + error_count} states:")
+    print(f"  - {success_count} successfully created or updated")
+    print(f"  - {len(plan.unchanged)} unchanged")
+    print(f"  - {error_count} failed")
+    return error_count == 0
+
+def send_county_data_to_api(client, records, journal, retries=RETRIES):
+    """Upsert county records in batches. Counties are keyed by FIPS, so resending is safe"""
+    print(f"Sending {len(records)} counties to API...")
+    
+    success_count = 0
+    error_count = 0
+    with METRICS.timer("stage_seconds", stage="send"):
+        for record, ok, detail in send_with_journal(client, records, journal, retries):
+            METRICS.count("records_total", stage="send", outcome="ok" if ok else "failed")
+            if ok:
+                success_count += 1
+            else:
+                print(f"API Error for county {record.get('Fips')}: {detail}")
+                error_count += 1
+    
+    print(f"Processed {success_count + error_count} counties:")
+    print(f"  - {success_count} successfully sent")
+    print(f"  - {error_count} failed")
+    return error_count == 0
+
+def parse_state_info(excel_dir, workers=None, cache_dir=None):
+    """Parse every workbook in excel_dir in parallel and report what was found."""
+    files = list_excel_files(excel_dir)
+    print(f"Parsing {len(files)} files from {excel_dir}...")
+    merged, _ = load_workbooks(files, workers=workers, cache_dir=cache_dir)
+    return merged
+
+def publish_snapshot(records, source_dir, out_dir, use_msgpack=False):
+    """Write the states snapshot and the tables derived from it to out_dir."""
+    write_snapshot(records, out_dir, use_msgpack=use_msgpack)
+    brackets = load_brackets(source_dir)
+    if brackets is not None:
+        write_brackets(*brackets, out_dir, use_msgpack=use_msgpack)
+    costs = compute_moving_costs(records, brackets=brackets)
+    write_moving_costs(costs, out_dir, use_msgpack=use_msgpack)
+    write_comparisons(compute_comparisons(records), out_dir)
+    write_rankings(records, out_dir, use_msgpack=use_msgpack)
+    write_similar(records, out_dir, use_msgpack=use_msgpack)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load state data into the States API")
+    parser.add_argument("--base-url", default=BASE_URL, help="API base url")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="records per bulk request, 1 sends one request per record")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY,
+                        help="maximum number of requests in flight at once")
+    parser.add_argument("--sync", action="store_true",
+                        help="update states whose values changed instead of skipping them")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="with --sync, print the changes without sending them")
+    parser.add_argument("--string-values", action="store_true",
+                        help="send every value as a string, as servers with an all-String "
+                             "States model expect")
+    parser.add_argument("--retries", type=int, default=RETRIES,
+                        help="extra rounds, with exponential backoff, for records that failed")
+    parser.add_argument("--fresh", action="store_true",
+                        help="ignore the journal of an interrupted run and resend everything")
+    parser.add_argument("--source-dir", default=EXCEL_DIR,
+                        help="directory holding the workbooks listed in sources.py")
+    parser.add_argument("--excel-dir", nargs="?", const=EXCEL_DIR, default=None,
+                        help=f"load rows from the spreadsheets in this directory "
+                             f"(default {EXCEL_DIR}) as-is instead of through sources.py")
+    parser.add_argument("--stream", nargs="?", type=int, const=STREAM_BATCH_SIZE, default=None,
+                        metavar="ROWS",
+                        help=f"with --excel-dir, stream each sheet and send it ROWS rows at "
+                             f"a time (default {STREAM_BATCH_SIZE}) to keep memory flat")
+    parser.add_argument("--force", action="store_true",
+                        help="re-read and re-send spreadsheets even if they haven't changed")
+    parser.add_argument("--parse", action="store_true",
+                        help="parse the state-info workbooks in parallel and report timings")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes used to parse workbooks (default: one per core)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always parse spreadsheets instead of using the parsed-sheet cache")
+    parser.add_argument("--counties", action="store_true",
+                        help="load the county-level sales and property tax rates into "
+                             "the Counties collection instead of the states")
+    parser.add_argument("--snapshot", nargs="?", const=SNAPSHOT_DIR, default=None,
+                        metavar="DIR",
+                        help=f"also write a static snapshot of the states, their income "
+                             f"tax brackets, the moving-cost table, the pairwise "
+                             f"comparisons, the ranking features and the similar-states "
+                             f"index to DIR (default {SNAPSHOT_DIR})")
+    parser.add_argument("--msgpack", action="store_true",
+                        help="with --snapshot, also write a MessagePack copy")
+    parser.add_argument("--no-send", action="store_true",
+                        help="build (and snapshot) the records without sending them")
+    parser.add_argument("--validation-report", metavar="PATH",
+                        help="also write the validation report to PATH as JSON")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write stage timings and counters to PATH, in Prometheus text "
+                             "format if it ends in .prom and as JSON otherwise")
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="PATH",
+                        help="run under cProfile, print the slowest functions and save the "
+                             "stats to PATH if given")
+    args = parser.parse_args()
+    # Only the state sync can stop before sending; anything else would send for real
+    if args.dry_run and (not args.sync or args.excel_dir or args.counties):
+        parser.error("--dry-run only works with --sync, and not with --excel-dir or "
+                     "--counties")
+    return args
+
+def open_journal(path, fresh=False):
+    """Open the send journal at path, discarding an earlier run's when fresh."""
+    if fresh and os.path.exists(path):
+        os.remove(path)
+    return Journal(path)
+
+def run(args):
+    """Run the ingest the command line asked for."""
+    client = StatesApiClient(args.base_url, batch_size=args.batch_size,
+                             concurrency=args.concurrency,
+                             resource="Counties" if args.counties else "States")
+    
     # Send all state data to API
-    send_state_data_to_api()
+    try:
+        cache_dir = None if args.no_cache else SHEET_CACHE_DIR
+        if args.parse:
+            parse_state_info(args.excel_dir or args.source_dir, args.workers, cache_dir)
+            if cache_dir:
+                prune_sheet_cache(args.excel_dir or args.source_dir)
+        elif args.excel_dir:
+            manifest = Manifest(MANIFEST_PATH)
+            cache = None if args.no_cache else SheetCache(SHEET_CACHE_DIR)
+            process_excel_dir(args.excel_dir, client, manifest, force=args.force, cache=cache,
+                              stream_batch_size=args.stream, typed=not args.string_values)
+            if cache:
+                prune_sheet_cache(args.excel_dir)
+        elif args.counties:
+            records = load_county_records(args.source_dir, args.workers,
+                                          report_path=args.validation_report)
+            if args.no_send or not records:
+                return
+            journal = open_journal(COUNTY_JOURNAL_PATH, args.fresh)
+            try:
+                if send_county_data_to_api(client, records, journal, args.retries):
+                    journal.complete()
+            finally:
+                journal.close()
+        else:
+            manifest = Manifest(SOURCES_MANIFEST_PATH)
+            # After a complete sync the database already holds what unchanged
+            # workbooks would build, so there is nothing to read or send
+            if (not args.force and not args.snapshot and not args.no_send
+                    and state_sources_unchanged(manifest, args.source_dir)):
+                print("Skipping: no workbook has changed since the last sync "
+                      "(use --force to re-read them)")
+                return
+            records = load_state_records(args.source_dir, args.workers, cache_dir,
+                                         typed=not args.string_values,
+                                         report_path=args.validation_report)
+            if cache_dir:
+                prune_sheet_cache(args.source_dir)
+            if records is None:
+                return
+            if args.snapshot:
+                publish_snapshot(records, args.source_dir, args.snapshot, args.msgpack)
+            if args.no_send:
+                return
+            journal = open_journal(JOURNAL_PATH, args.fresh)
+            try:
+                if args.sync:
+                    done = sync_state_data(client, records, journal, dry_run=args.dry_run,
+                                           retries=args.retries)
+                else:
+                    done = send_state_data_to_api(client, records, journal, args.retries)
+                if done:
+                    journal.complete()
+                    # A plain send skips existing states, so only a sync leaves the
+                    # database matching the workbooks
+                    if args.sync:
+                        record_state_sources(manifest, args.source_dir, records)
+            finally:
+                journal.close()
+    finally:
+        client.close()
+
+def main():
+    args = parse_args()
+    try:
+        if args.profile is not None:
+            with profiled(args.profile or None):
+                run(args)
+        else:
+            run(args)
+    finally:
+        METRICS.print_summary()
+        if args.metrics:
+            METRICS.write(args.metrics)
+            print(f"Wrote metrics to {args.metrics}")
     print("Processing complete.")
 
 if __name__ == "__main__":
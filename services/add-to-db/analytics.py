@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Scores derived from the state records once per ingest, for all states at once.
+
+The States API used to rank by affordability by loading every document and working
+the score out per request. add_affordability_scores() computes it here instead,
+with the same formula, and stores it on each record as AffordabilityScore, an
+indexed field the API can sort and page on directly. Higher means more expensive.
+"""
+
+import numpy as np
+
+from metrics import METRICS
+
+# Weights of the composite score, as the States controller used them
+COST_OF_LIVING_WEIGHT = 2
+HOME_PRICE_WEIGHT = 0.5 / 1000  # per dollar of median home price
+TAX_WEIGHT = 3
+PROPERTY_TAX_WEIGHT = 6  # within the tax component, relative to income and sales tax
+# Decimals kept in the stored score, so re-ingesting the same data changes nothing
+SCORE_DECIMALS = 4
+
+
+def numeric_matrix(records, fields, missing=0.0):
+    """A float array with a row per record and a column per field.
+
+    Missing or non-numeric values are `missing`; the default 0 is what
+    parseFloat(...) || 0 made them.
+    """
+    matrix = np.full((len(records), len(fields)), missing, dtype=float)
+    for i, record in enumerate(records):
+        for j, field in enumerate(fields):
+            try:
+                matrix[i, j] = float(record.get(field))
+            except (TypeError, ValueError):
+                continue
+    matrix[~np.isfinite(matrix)] = missing
+    return matrix
+
+
+def column_scale(values):
+    """Means and standard deviations of the columns, ignoring missing (NaN) values.
+
+    The deviations are of the columns with missing values filled with the mean.
+    """
+    present = (~np.isnan(values)).sum(axis=0)
+    means = np.divide(np.nansum(values, axis=0), present, out=np.zeros(values.shape[1]),
+                      where=present > 0)
+    filled = np.where(np.isnan(values), means, values)
+    return means, filled.std(axis=0)
+
+
+def affordability_components(records):
+    """The parts of each record's affordability score, as {component: array}."""
+    values = numeric_matrix(records, ["CostOfLiving", "MedianHomePrice", "IncomeTax",
+                                      "PropertyTaxes", "SalesTax"])
+    cost_of_living, home_price, income_tax, property_tax, sales_tax = values.T
+    components = {
+        "CostOfLiving": cost_of_living * COST_OF_LIVING_WEIGHT,
+        "HomePrice": home_price * HOME_PRICE_WEIGHT,
+        "Taxes": (income_tax + property_tax * PROPERTY_TAX_WEIGHT + sales_tax) * TAX_WEIGHT,
+    }
+    components["Score"] = sum(components.values())
+    return components
+
+
+def add_affordability_scores(records):
+    """Set AffordabilityScore on every record. Returns the components."""
+    with METRICS.timer("stage_seconds", stage="analyze"):
+        components = affordability_components(records)
+        scores = np.round(components["Score"], SCORE_DECIMALS)
+        for record, score in zip(records, scores.tolist()):
+            record["AffordabilityScore"] = score
+    return components
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""HTTP client used by the ingest scripts to push state data to the States API."""
+
+import time
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+
+from metrics import METRICS
+
+# Status codes that mean "slow down and try again" rather than "bad record"
+RETRYABLE_STATUS = {429, 502, 503, 504}
+# Status codes that mean the server has no bulk endpoint
+MISSING_ENDPOINT_STATUS = {404, 405, 501}
+# readStates' default page size
+PAGE_SIZE = 55
+
+
+class Backoff:
+    """Adaptive delay between requests, driven by the responses the server sends back.
+
+    Starts with no delay at all. Throttling and overload responses (429, 502, 503 and
+    504; see RETRYABLE_STATUS) and connection errors grow the delay exponentially (or
+    jump straight to the server's Retry-After), and every success shrinks it again, so
+    a healthy server is never slept on. A 500 is the server rejecting the request, so
+    it isn't retried.
+    """
+
+    def __init__(self, initial=0.0, step=0.25, maximum=30.0, factor=2.0, decay=0.5):
+        self.delay = initial
+        self.step = step
+        self.maximum = maximum
+        self.factor = factor
+        self.decay = decay
+        self.lock = threading.Lock()
+
+    def wait(self):
+        delay = self.delay
+        if delay > 0:
+            METRICS.count("backoff_sleep_seconds_total", delay)
+            time.sleep(delay)
+
+    def success(self):
+        with self.lock:
+            self.delay *= self.decay
+            if self.delay < self.step / 4:
+                self.delay = 0.0
+
+    def failure(self, retry_after=None):
+        with self.lock:
+            if retry_after is not None:
+                self.delay = min(self.maximum, retry_after)
+            else:
+                self.delay = min(self.maximum, max(self.step, self.delay * self.factor))
+
+
+def parse_retry_after(response):
+    """Return the Retry-After header in seconds, or None if absent/unparseable."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def strip_id(record):
+    """The JSON body for a record. The id goes in the update URL, never in the body."""
+    return {k: v for k, v in record.items() if k != "_id"}
+
+
+class StatesApiClient:
+    """Sends state records to the API in chunks, falling back to one POST per record.
+
+    All requests go through one keep-alive session whose connection pool is sized to
+    `concurrency`, and a semaphore caps how many requests are in flight at once.
+    resource="Counties" talks to the Counties routes, which work the same way.
+    """
+
+    def __init__(self, base_url, batch_size=25, concurrency=8, max_retries=5, timeout=30,
+                 backoff=None, resource="States"):
+        self.base_url = base_url.rstrip("/")
+        self.resource = resource
+        self.create_url = f"{self.base_url}/{resource}/create"
+        self.bulk_url = f"{self.base_url}/{resource}/bulk"
+        self.read_url = f"{self.base_url}/{resource}/read"
+        self.update_url = f"{self.base_url}/{resource}/update"
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max(1, max_retries)
+        self.timeout = timeout
+        self.backoff = backoff or Backoff()
+        self.concurrency = max(1, concurrency)
+        self.in_flight = threading.BoundedSemaphore(self.concurrency)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # None until the first bulk call tells us whether the server supports it
+        self.bulk_supported = None if self.batch_size > 1 else False
+
+    def request(self, method, url, **kwargs):
+        """Issue a request, retrying throttled/failed calls with adaptive backoff."""
+        kwargs.setdefault("timeout", self.timeout)
+        last_error = None
+        for _ in range(self.max_retries):
+            self.backoff.wait()
+            start = time.perf_counter()
+            try:
+                with self.in_flight:
+                    response = self.session.request(method, url, **kwargs)
+            except requests.RequestException as e:
+                METRICS.observe("http_request_seconds", time.perf_counter() - start,
+                                method=method, status="error")
+                METRICS.count("http_requests_total", method=method, status="error")
+                last_error = e
+                self.backoff.failure()
+                continue
+            status = str(response.status_code)
+            METRICS.observe("http_request_seconds", time.perf_counter() - start,
+                            method=method, status=status)
+            METRICS.count("http_requests_total", method=method, status=status)
+            if response.status_code in RETRYABLE_STATUS:
+                last_error = None
+                self.backoff.failure(parse_retry_after(response))
+                continue
+            self.backoff.success()
+            return response
+        if last_error is not None:
+            raise last_error
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def read_page(self, page, limit=PAGE_SIZE):
+        """Fetch one page of readStates."""
+        response = self.get(self.read_url, params={"page": page, "limit": limit})
+        if response.status_code != 200:
+            raise requests.HTTPError(f"{response.status_code} - {response.text}")
+        return response.json()
+
+    def iter_all(self, limit=PAGE_SIZE):
+        """Yield every existing state document as pages arrive.
+
+        The first page's totalPages says how many more there are; those are then
+        fetched concurrently over the shared session. Raises if a page fails or
+        fewer documents arrive than the first page's total, so callers never take
+        a partial listing for the whole collection.
+        """
+        first = self.read_page(0, limit)
+        if not isinstance(first, dict):
+            # Older servers return every document as a plain list
+            yield from first
+            return
+        count = len(first.get("data", []))
+        yield from first.get("data", [])
+        total_pages = first.get("totalPages") or 0
+        if total_pages > 1:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                futures = [pool.submit(self.read_page, page, limit)
+                           for page in range(1, total_pages)]
+                for future in as_completed(futures):
+                    data = future.result().get("data", [])
+                    count += len(data)
+                    yield from data
+        total = first.get("total")
+        if total is not None and count != total:
+            raise RuntimeError(f"Listed {count} of {total} documents; the listing is "
+                               f"incomplete")
+
+    def post_record(self, url, record):
+        try:
+            response = self.request("POST", url, json=record)
+        except requests.RequestException as e:
+            return False, f"Request error: {str(e)}"
+        if response.status_code in [200, 201, 204]:
+            return True, ""
+        return False, f"{response.status_code} - {response.text}"
+
+    def create(self, record):
+        """POST a single record to the create endpoint. Returns (ok, detail)."""
+        return self.post_record(self.create_url, strip_id(record))
+
+    def update(self, doc_id, record):
+        """POST a single record to the update endpoint. Returns (ok, detail)."""
+        return self.post_record(f"{self.update_url}/{doc_id}", strip_id(record))
+
+    def save(self, record):
+        """Update the record if it carries an _id, create it otherwise."""
+        if record.get("_id"):
+            return self.update(record["_id"], record)
+        return self.create(record)
+
+    def bulk_upsert(self, records):
+        """POST a chunk of records to the bulk endpoint.
+
+        Returns True on success, False if the chunk was rejected and None if the
+        server has no bulk endpoint.
+        """
+        try:
+            # The bulk routes take {"states": [...]} or {"counties": [...]}
+            response = self.request("POST", self.bulk_url,
+                                    json={self.resource.lower(): records})
+        except requests.RequestException as e:
+            print(f"Bulk request error: {str(e)}")
+            return False
+        if response.status_code in MISSING_ENDPOINT_STATUS:
+            return None
+        if response.status_code in [200, 201, 204]:
+            return True
+        print(f"Bulk API Error: {response.status_code} - {response.text}")
+        return False
+
+    def send_chunk(self, chunk):
+        """Send one chunk, returning [(record, ok, detail), ...].
+
+        A rejected bulk chunk is retried record by record so one bad row doesn't
+        fail its neighbours.
+        """
+        if self.bulk_supported is not False and len(chunk) > 1:
+            result = self.bulk_upsert([strip_id(record) for record in chunk])
+            if result is None:
+                if self.bulk_supported is None:
+                    print("Server has no bulk endpoint, falling back to per-record requests")
+                self.bulk_supported = False
+            elif result:
+                self.bulk_supported = True
+                return [(record, True, "") for record in chunk]
+        results = []
+        for record in chunk:
+            ok, detail = self.save(record)
+            results.append((record, ok, detail))
+        return results
+
+    def send(self, records):
+        """Send records concurrently, in chunks of batch_size when bulk is available.
+
+        Yields (record, ok, detail) for every record as chunks complete, so callers
+        can keep their own counters on the calling thread.
+        """
+        records = list(records)
+        start = 0
+        if self.bulk_supported is None and len(records) > 1:
+            # The first chunk tells us whether the bulk endpoint exists
+            start = min(self.batch_size, len(records))
+            yield from self.send_chunk(records[:start])
+        # Only a missing endpoint rules bulk out; a failed first chunk may be transient
+        size = 1 if self.bulk_supported is False else self.batch_size
+        chunks = [records[i:i + size] for i in range(start, len(records), size)]
+        if not chunks:
+            return
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = [pool.submit(self.send_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                yield from future.result()
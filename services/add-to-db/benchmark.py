@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""Ingest throughput benchmark.
+
+Generates synthetic spreadsheets in the layout process_excel_file reads (one row per
+state or county, the REQUIRED_FIELDS columns plus a name) and times each ingest stage
+on its own:
+
+    parse      stream the workbook into DataFrames (or pd.read_excel with --reader pandas)
+    validate   check the columns and type/range check every row against the schema
+    transform  build the records from the validated, typed frames
+    send       post the records through StatesApiClient
+
+Sends go to an in-process FakeStatesServer unless --base-url is given. Each stage
+reports records/sec and the process's peak RSS so far; the send stage also reports
+p50/p99 request latency. Save a run with --output and compare a later run against it
+with --baseline to catch regressions:
+
+    python benchmark.py --sizes 50 3000 --output bench.json
+    python benchmark.py --sizes 50 3000 --baseline bench.json --tolerance 0.2
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import resource
+import sys
+import time
+import pandas as pd
+
+from api_client import StatesApiClient
+from fake_server import FakeStatesServer
+from loader import US_STATES
+from schema import GRADES, POLITICAL_LEANINGS
+from sheet_reader import iter_frames
+from validation import records_from_frame, validate_frame
+
+# The ingest script's name has hyphens, so it can't be imported with a plain import
+ingest = importlib.import_module("add-data-from-excel")
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_DIR = os.path.join(SCRIPT_DIR, ".ingest-cache", "benchmark")
+DEFAULT_SIZES = [50, 3000, 100_000]
+STAGES = ["parse", "validate", "transform", "send"]
+# Stages faster than this are timer noise and aren't compared against a baseline
+MIN_COMPARABLE_SECONDS = 0.05
+
+
+def synthetic_row(rng, index, per_state):
+    """One row of plausible values; rows past the first state-sized set are counties."""
+    state = US_STATES[index % len(US_STATES)]
+    name = state if per_state else f"County {index // len(US_STATES) + 1}, {state}"
+    return {
+        "name": name,
+        "MedianHomePrice": round(rng.uniform(150_000, 900_000), 2),
+        "CapitalGainsTax": round(rng.uniform(0, 13.3), 2),
+        "IncomeTax": round(rng.uniform(0, 13.3), 2),
+        "SalesTax": round(rng.uniform(0, 10), 2),
+        "PropertyTax": round(rng.uniform(0.3, 2.5), 2),
+        "Abortion": rng.choice(GRADES),
+        "CostOfLiving": round(rng.uniform(80, 190), 1),
+        "K12SchoolPerformance": rng.randint(1, 50),
+        "HigherEdPerformance": rng.randint(1, 50),
+        "ForestedLand": round(rng.uniform(0, 90), 2),
+        "GunLaws": rng.choice(GRADES),
+        "MinimumWage": round(rng.uniform(7.25, 17.5), 2),
+        "Population": rng.randint(500_000, 40_000_000),
+        "VoilentCrimes": round(rng.uniform(100, 900), 1),
+        "PoliticalLeaning": rng.choice(POLITICAL_LEANINGS),
+    }
+
+
+def synthetic_dataset(rows, seed=0, dataset_dir=DATASET_DIR):
+    """Path of an xlsx with `rows` synthetic rows, generated once and then reused."""
+    path = os.path.join(dataset_dir, f"synthetic-{rows}-seed{seed}.xlsx")
+    if os.path.exists(path):
+        return path
+    print(f"Generating {rows} synthetic rows in {path}...")
+    os.makedirs(dataset_dir, exist_ok=True)
+    rng = random.Random(seed)
+    per_state = rows <= len(US_STATES)
+    df = pd.DataFrame([synthetic_row(rng, i, per_state) for i in range(rows)])
+    partial = f"{path}.partial.xlsx"
+    df.to_excel(partial, index=False)
+    os.replace(partial, path)
+    return path
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes everywhere else
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class TimedClient(StatesApiClient):
+    """StatesApiClient that records how long every request took, retries included."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies = []
+
+    def request(self, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().request(method, url, **kwargs)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+
+def stage_result(stage, rows, seconds, **extra):
+    result = {
+        "stage": stage,
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "records_per_sec": round(rows / seconds, 1) if seconds > 0 else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    result.update(extra)
+    return result
+
+
+def run_parse(path, reader, batch_size):
+    start = time.perf_counter()
+    if reader == "pandas":
+        frames = [pd.read_excel(path)]
+    else:
+        frames = list(iter_frames(path, batch_size=batch_size))
+    seconds = time.perf_counter() - start
+    return frames, stage_result("parse", sum(len(df) for df in frames), seconds)
+
+
+def run_validate(frames):
+    """Validate the frames. Returns (typed frames of the valid rows, result)."""
+    invalid = 0
+    rows = 0
+    checked_frames = []
+    # County names aren't state names, so only the data fields are checked
+    required = [field for field in ingest.REQUIRED_FIELDS if field != "Name"]
+    start = time.perf_counter()
+    for df in frames:
+        df = df.rename(columns=ingest.FIELD_MAPPING).reset_index(drop=True)
+        checked, report = validate_frame(df.drop(columns="Name"), required=required)
+        invalid += len(df) if report.missing_columns else report.invalid_count
+        rows += len(df)
+        if not report.missing_columns:
+            checked_frames.append(checked.assign(Name=df["Name"])[~report.invalid])
+    seconds = time.perf_counter() - start
+    return checked_frames, stage_result("validate", rows, seconds, invalid=invalid)
+
+
+def run_transform(checked_frames):
+    start = time.perf_counter()
+    records = []
+    for checked in checked_frames:
+        records.extend(records_from_frame(checked))
+    seconds = time.perf_counter() - start
+    return records, stage_result("transform", len(records), seconds)
+
+
+def run_send(records, base_url, batch_size, concurrency):
+    client = TimedClient(base_url, batch_size=batch_size, concurrency=concurrency)
+    failed = 0
+    start = time.perf_counter()
+    try:
+        for _, ok, _ in client.send(records):
+            failed += not ok
+    finally:
+        client.close()
+    seconds = time.perf_counter() - start
+    latencies = client.latencies
+    return stage_result(
+        "send", len(records), seconds,
+        failed=failed,
+        requests=len(latencies),
+        p50_ms=round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        p99_ms=round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+    )
+
+
+def run_benchmark(path, stages, base_url, args):
+    """Run the selected stages on one dataset; later stages reuse earlier output."""
+    results = []
+    frames, parsed = run_parse(path, args.reader, args.stream_batch_size)
+    if "parse" in stages:
+        results.append(parsed)
+    if "validate" in stages or "transform" in stages or "send" in stages:
+        checked_frames, validated = run_validate(frames)
+        if "validate" in stages:
+            results.append(validated)
+    if "transform" in stages or "send" in stages:
+        records, transformed = run_transform(checked_frames)
+        if "transform" in stages:
+            results.append(transformed)
+        if "send" in stages:
+            results.append(run_send(records, base_url, args.batch_size, args.concurrency))
+    return results
+
+
+def print_results(rows, results):
+    print(f"\n{rows} rows")
+    print(f"  {'stage':<10} {'seconds':>9} {'records/s':>11} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'peak RSS MB':>12}")
+    for result in results:
+        p50 = result.get("p50_ms")
+        p99 = result.get("p99_ms")
+        print(f"  {result['stage']:<10} {result['seconds']:>9.3f} "
+              f"{result['records_per_sec'] or 0:>11.0f} "
+              f"{'' if p50 is None else f'{p50:.1f}':>8} "
+              f"{'' if p99 is None else f'{p99:.1f}':>8} "
+              f"{result['peak_rss_mb']:>12.1f}")
+        if result.get("invalid") or result.get("failed"):
+            print(f"    {result.get('invalid', 0)} invalid, {result.get('failed', 0)} failed")
+
+
+def find_regressions(report, baseline, tolerance):
+    """Stages whose records/sec dropped more than `tolerance` below the baseline."""
+    previous = {(run["rows"], result["stage"]): result["records_per_sec"]
+                for run in baseline.get("runs", []) for result in run["results"]}
+    regressions = []
+    for run in report["runs"]:
+        for result in run["results"]:
+            before = previous.get((run["rows"], result["stage"]))
+            now = result["records_per_sec"]
+            if result["seconds"] < MIN_COMPARABLE_SECONDS:
+                continue
+            if before and now is not None and now < before * (1 - tolerance):
+                regressions.append(f"{run['rows']} rows, {result['stage']}: "
+                                   f"{now:.0f} records/s vs {before:.0f} in the baseline")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the ingest stages on synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="dataset sizes in rows (default: 50 3000 100000)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--reader", choices=["stream", "pandas"], default="stream",
+                        help="parse with the streaming reader or pd.read_excel")
+    parser.add_argument("--stream-batch-size", type=int, default=ingest.STREAM_BATCH_SIZE)
+    parser.add_argument("--base-url", default=None,
+                        help="send to this API instead of an in-process fake server")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds of latency the fake server adds per request")
+    parser.add_argument("--batch-size", type=int, default=ingest.BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=ingest.CONCURRENCY)
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="run each dataset this many times and keep the fastest")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a JSON file written by --output")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed records/sec drop against the baseline (default 0.2)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    server = None
+    base_url = args.base_url
+    if "send" in args.stages and base_url is None:
+        server = FakeStatesServer(latency=args.latency, seed=args.seed).start()
+        base_url = server.base_url
+    report = {"created": time.time(), "reader": args.reader, "runs": []}
+    try:
+        for rows in args.sizes:
+            path = synthetic_dataset(rows, args.seed)
+            # Keep each stage's fastest run; small datasets are noisy otherwise
+            repeats = [run_benchmark(path, args.stages, base_url, args)
+                       for _ in range(args.repeat)]
+            results = [min(runs, key=lambda result: result["seconds"])
+                       for runs in zip(*repeats)]
+            print_results(rows, results)
+            report["runs"].append({"rows": rows, "results": results})
+    finally:
+        if server is not None:
+            server.stop()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against the baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\nNo regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
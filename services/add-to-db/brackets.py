@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""Progressive income tax bracket schedules, per state and filing status.
+
+The States collection keeps only each state's top marginal rate, which says little
+about what someone on an ordinary income pays. parse_brackets() reads the bracket
+workbook into one BracketSchedule per state and filing status: the bracket
+thresholds in ascending order, the rate of each bracket, and the tax owed at each
+threshold. Tax on an income is then one binary search plus one multiply-add, and
+tax_many() does the same for a whole array of incomes with np.searchsorted.
+
+The Tax Foundation layout is a row per bracket: the state name on its first row,
+then "rate > threshold" cells for single filers followed by the same for married
+couples filing jointly, under a header row naming the two. Each bracket goes to the
+status whose columns it is in, as schedules can have different numbers of brackets.
+A sheet with a single rate per state (the top marginal rate only) is read as a flat
+schedule at that rate and published with "exact": false, so readers know the result
+is an upper bound rather than the state's real schedule.
+"""
+
+import argparse
+import os
+import re
+import numpy as np
+from bisect import bisect_right
+
+from loader import normalize_state_name
+from manifest import records_hash
+from sheet_reader import iter_rows
+from snapshot import SNAPSHOT_VERSION, write_static
+
+BRACKETS_FILENAME = "2025-State-Individual-Income-Tax-Rates-and-Brackets-2025.xlsx"
+BRACKETS_NAME = "income-tax-brackets"
+FILING_STATUSES = ["single", "married"]
+# Rows searched for the first state before giving up on a sheet
+HEADER_SCAN_ROWS = 20
+
+# The abbreviations the Tax Foundation tables use for state names
+STATE_ABBREVIATIONS = {
+    "Ala.": "Alabama", "Ariz.": "Arizona", "Ark.": "Arkansas", "Calif.": "California",
+    "Colo.": "Colorado", "Conn.": "Connecticut", "Del.": "Delaware", "Fla.": "Florida",
+    "Ga.": "Georgia", "Ill.": "Illinois", "Ind.": "Indiana", "Kans.": "Kansas",
+    "Ky.": "Kentucky", "La.": "Louisiana", "Md.": "Maryland", "Mass.": "Massachusetts",
+    "Mich.": "Michigan", "Minn.": "Minnesota", "Miss.": "Mississippi", "Mo.": "Missouri",
+    "Mont.": "Montana", "Nebr.": "Nebraska", "Nev.": "Nevada", "N.H.": "New Hampshire",
+    "N.J.": "New Jersey", "N.M.": "New Mexico", "N.Y.": "New York",
+    "N.C.": "North Carolina", "N.D.": "North Dakota", "Okla.": "Oklahoma",
+    "Ore.": "Oregon", "Pa.": "Pennsylvania", "R.I.": "Rhode Island",
+    "S.C.": "South Carolina", "S.D.": "South Dakota", "Tenn.": "Tennessee",
+    "Tex.": "Texas", "Vt.": "Vermont", "Va.": "Virginia", "Wash.": "Washington",
+    "W.Va.": "West Virginia", "Wis.": "Wisconsin", "Wyo.": "Wyoming",
+}
+
+
+class BracketSchedule:
+    """One state's brackets for one filing status.
+
+    thresholds[i] is where bracket i starts (the first is always 0), rates[i] its
+    marginal rate as a fraction, and base[i] the tax owed on exactly thresholds[i].
+    """
+
+    __slots__ = ("thresholds", "rates", "base")
+
+    def __init__(self, brackets):
+        brackets = sorted((float(threshold), float(rate)) for threshold, rate in brackets)
+        if not brackets or brackets[0][0] > 0:
+            brackets.insert(0, (0.0, 0.0))
+        self.thresholds = [threshold for threshold, _ in brackets]
+        self.rates = [rate for _, rate in brackets]
+        self.base = [0.0]
+        for i in range(1, len(brackets)):
+            width = self.thresholds[i] - self.thresholds[i - 1]
+            self.base.append(self.base[-1] + width * self.rates[i - 1])
+
+    def tax(self, income):
+        """Tax owed on a taxable income."""
+        i = bisect_right(self.thresholds, income) - 1
+        if i < 0:
+            return 0.0
+        return self.base[i] + (income - self.thresholds[i]) * self.rates[i]
+
+    def effective_rate(self, income):
+        return self.tax(income) / income if income > 0 else 0.0
+
+    def tax_many(self, incomes):
+        """tax() of every income in an array at once."""
+        incomes = np.asarray(incomes, dtype=float)
+        i = np.searchsorted(self.thresholds, incomes, side="right") - 1
+        i = np.clip(i, 0, None)
+        taxes = (np.asarray(self.base)[i]
+                 + (incomes - np.asarray(self.thresholds)[i]) * np.asarray(self.rates)[i])
+        return np.where(incomes > 0, taxes, 0.0)
+
+    @property
+    def top_rate(self):
+        return self.rates[-1]
+
+    def to_list(self):
+        """[[threshold, rate in percent], ...], the published form."""
+        return [[int(threshold) if threshold.is_integer() else threshold,
+                 round(rate * 100, 4)] for threshold, rate in zip(self.thresholds, self.rates)]
+
+    def __eq__(self, other):
+        if not isinstance(other, BracketSchedule):
+            return NotImplemented
+        return self.thresholds == other.thresholds and self.rates == other.rates
+
+    def __repr__(self):
+        return f"BracketSchedule({self.to_list()!r})"
+
+    __hash__ = None
+
+
+def state_name(cell):
+    """The state a name cell refers to, allowing abbreviations and "(a, b)" footnotes."""
+    if not isinstance(cell, str):
+        return None
+    name = re.sub(r"\([^)]*\)", "", cell).strip()
+    return normalize_state_name(STATE_ABBREVIATIONS.get(name, name))
+
+
+def parse_rate(cell):
+    """A rate cell as a fraction: 0.0525, "5.25%" and "none" become 0.0525, .0525, 0."""
+    if isinstance(cell, str):
+        text = cell.strip().lower()
+        if text in ("none", "n/a", ""):
+            return 0.0
+        if text.endswith("%"):
+            return float(text.rstrip("%").replace(",", "")) / 100
+        return float(text.replace(",", ""))
+    return float(cell)
+
+
+def parse_threshold(cell):
+    """A threshold cell as a number: 10000 and "$10,000" both become 10000.0."""
+    if isinstance(cell, str):
+        return float(cell.strip().lstrip("$").replace(",", ""))
+    return float(cell)
+
+
+def bracket_pairs(row):
+    """The (rate column, threshold, rate) of each "rate > threshold" cell run in a row."""
+    pairs = []
+    for i, cell in enumerate(row):
+        if isinstance(cell, str) and cell.strip() == ">" and 0 < i < len(row) - 1:
+            try:
+                pairs.append((i - 1, parse_threshold(row[i + 1]), parse_rate(row[i - 1])))
+            except (TypeError, ValueError):
+                continue
+    return pairs
+
+
+def header_columns(row):
+    """{status: first column} of the filing statuses a header row names."""
+    columns = {}
+    for i, cell in enumerate(row):
+        text = cell.lower() if isinstance(cell, str) else ""
+        if "single" in text:
+            columns.setdefault("single", i)
+        elif "married" in text or "joint" in text:
+            columns.setdefault("married", i)
+    return columns if len(columns) == len(FILING_STATUSES) else {}
+
+
+def column_status(columns, column):
+    """The filing status whose column range holds `column`."""
+    starts = [(start, status) for status, start in columns.items() if start <= column]
+    return max(starts)[1] if starts else None
+
+
+def parse_brackets(path, sheet=0):
+    """Read a bracket workbook. Returns ({state: {status: BracketSchedule}}, exact).
+
+    exact is False when the sheet only gives each state's top marginal rate. Brackets
+    go to the filing status whose columns they are in, as named by the header row, or
+    failing that, as laid out by the first row with a bracket for every status.
+    """
+    brackets = {}
+    flat = {}
+    state = None
+    columns = {}
+    for i, row in enumerate(iter_rows(path, sheet)):
+        name = state_name(row[0]) if row else None
+        if name is not None:
+            state = name
+            brackets.setdefault(state, {status: [] for status in FILING_STATUSES})
+        elif state is None:
+            columns = columns or header_columns(row)
+            if i + 1 >= HEADER_SCAN_ROWS:
+                break
+            continue
+        elif row and isinstance(row[0], str) and row[0].strip():
+            # Footnotes and notes below the table end the current state
+            state = None
+            continue
+
+        pairs = bracket_pairs(row)
+        if not columns and len(pairs) == len(FILING_STATUSES):
+            columns = {status: column
+                       for status, (column, _, _) in zip(FILING_STATUSES, pairs)}
+        if pairs and columns:
+            for column, threshold, rate in pairs:
+                status = column_status(columns, column)
+                if status is not None:
+                    brackets[state][status].append((threshold, rate))
+        elif pairs:
+            # No layout yet: a lone bracket is the single filer's, and applies to
+            # couples too
+            brackets[state]["single"].append(pairs[0][1:])
+            brackets[state]["married"].append(pairs[-1][1:])
+        elif name is not None and len(row) > 1:
+            try:
+                flat[state] = parse_rate(row[1])
+            except (TypeError, ValueError):
+                pass
+
+    exact = any(schedules["single"] for schedules in brackets.values())
+    tables = {}
+    for state, schedules in brackets.items():
+        if exact:
+            tables[state] = {status: BracketSchedule(pairs)
+                             for status, pairs in schedules.items()}
+        elif state in flat:
+            schedule = BracketSchedule([(0, flat[state])])
+            tables[state] = {status: schedule for status in FILING_STATUSES}
+    return tables, exact
+
+
+def brackets_payload(tables, exact, etag):
+    return {
+        "version": SNAPSHOT_VERSION,
+        "etag": etag,
+        "exact": exact,
+        "unit": "percent",
+        "states": {state: {status: schedule.to_list()
+                           for status, schedule in schedules.items()}
+                   for state, schedules in sorted(tables.items())},
+    }
+
+
+def tables_from_payload(payload):
+    """The (tables, exact) a published brackets payload was written from."""
+    tables = {state: {status: BracketSchedule((threshold, rate / 100)
+                                              for threshold, rate in brackets)
+                      for status, brackets in schedules.items()}
+              for state, schedules in payload["states"].items()}
+    return tables, payload["exact"]
+
+
+def write_brackets(tables, exact, out_dir, use_msgpack=False):
+    """Publish the bracket tables next to the states snapshot. Returns the index dict."""
+    payload = brackets_payload(tables, exact, None)
+    etag = records_hash([payload])[:16]
+    payload["etag"] = etag
+    return write_static(BRACKETS_NAME, payload, etag, len(tables), out_dir, use_msgpack)
+
+
+def load_brackets(excel_dir):
+    """Parse the bracket workbook in excel_dir, or return None if it isn't there."""
+    path = os.path.join(excel_dir, BRACKETS_FILENAME)
+    if not os.path.exists(path):
+        print(f"Warning: {BRACKETS_FILENAME} not found in {excel_dir}")
+        return None
+    try:
+        tables, exact = parse_brackets(path)
+    except Exception as e:
+        print(f"Error reading income tax brackets: {str(e)}")
+        return None
+    brackets = sum(len(schedules["single"].rates) for schedules in tables.values())
+    print(f"Read income tax brackets for {len(tables)} states ({brackets} single-filer "
+          f"brackets)" + ("" if exact else "; top marginal rates only"))
+    return tables, exact
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Print the state income tax owed at some incomes.")
+    parser.add_argument("incomes", nargs="*", type=float, default=[50000, 100000, 250000])
+    parser.add_argument("--excel-dir",
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                             "state-info"))
+    parser.add_argument("--status", choices=FILING_STATUSES, default="single")
+    args = parser.parse_args()
+
+    loaded = load_brackets(args.excel_dir)
+    if loaded is None:
+        return
+    tables, _ = loaded
+    print(f"{'State':<22}" + "".join(f"{income:>16,.0f}" for income in args.incomes))
+    for state, schedules in sorted(tables.items()):
+        taxes = schedules[args.status].tax_many(args.incomes)
+        print(f"{state:<22}" + "".join(
+            f"{tax:>9,.0f} {tax / income if income else 0:>5.1%}"
+            for tax, income in zip(taxes, args.incomes)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Every state compared with every other, on every numeric metric, precomputed.
+
+The compare page fetches all states and diffs the selected ones in the browser.
+compute_comparisons() does it for every ordered pair at once: difference[i, j, m]
+is state j's value of metric m minus state i's, and percent[i, j, m] the same as a
+percentage of state i's value (NaN where state i's value is 0 or either is missing).
+
+write_comparisons() publishes both as one little-endian float32 file of shape
+[2, states, states, metrics] next to the states snapshot. The JSON index names
+the states, metrics and array order, so a reader finds any single comparison at
+
+    ((array * states + i) * states + j) * metrics + m
+
+float32s into the file, by itself or with an HTTP range request.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import numpy as np
+
+from analytics import numeric_matrix
+from metrics import METRICS
+from schema import STATE_SCHEMA
+from snapshot import (SNAPSHOT_DIR, SNAPSHOT_NAME, index_name, load_index, read_static,
+                      write_binary)
+from state_record import DERIVED_FIELDS
+
+COMPARISONS_NAME = "comparisons"
+# The numeric States fields, in model order
+COMPARE_FIELDS = ([field for field, spec in STATE_SCHEMA.items() if spec.kind != "category"]
+                  + DERIVED_FIELDS)
+ARRAYS = ["difference", "percentChange"]
+DTYPE = "<f4"
+
+
+class Comparisons:
+    """The [array, from state, to state, metric] cube and how to index it."""
+
+    def __init__(self, states, metrics, values):
+        self.states = states
+        self.metrics = metrics
+        self.values = values
+        self.positions = {state: i for i, state in enumerate(states)}
+
+    @property
+    def difference(self):
+        return self.values[0]
+
+    @property
+    def percent(self):
+        return self.values[1]
+
+    def compare(self, from_state, to_state):
+        """{metric: (difference, percent change)} going from one state to another."""
+        i, j = self.positions[from_state], self.positions[to_state]
+        return {metric: (float(self.values[0, i, j, m]), float(self.values[1, i, j, m]))
+                for m, metric in enumerate(self.metrics)}
+
+    def index_fields(self):
+        """What a reader needs, besides the file name, to find a value in the file."""
+        return {"dtype": DTYPE, "shape": list(self.values.shape), "arrays": ARRAYS,
+                "states": self.states, "metrics": self.metrics}
+
+
+def compute_comparisons(records, fields=COMPARE_FIELDS):
+    """Build the Comparisons of every ordered pair of the records' states."""
+    with METRICS.timer("stage_seconds", stage="analyze"):
+        records = sorted(records, key=lambda record: str(record.get("Name")))
+        states = [record.get("Name") for record in records]
+        values = numeric_matrix(records, fields, missing=np.nan)
+        difference = values[None, :, :] - values[:, None, :]
+        base = np.abs(values)[:, None, :]
+        percent = np.divide(difference * 100, base, out=np.full_like(difference, np.nan),
+                            where=base > 0)
+        cube = np.stack([difference, percent]).astype(DTYPE)
+    return Comparisons(states, list(fields), cube)
+
+
+def write_comparisons(comparisons, out_dir):
+    """Publish the cube and its JSON index next to the states snapshot."""
+    data = comparisons.values.tobytes(order="C")
+    fields = comparisons.index_fields()
+    digest = hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8"))
+    digest.update(data)
+    etag = digest.hexdigest()[:16]
+    return write_binary(COMPARISONS_NAME, data, etag, len(comparisons.states), out_dir,
+                        suffix="f32", **fields)
+
+
+def read_comparisons(out_dir):
+    """The Comparisons write_comparisons() last published to out_dir, or None."""
+    index = load_index(os.path.join(out_dir, index_name(COMPARISONS_NAME)))
+    if index is None:
+        return None
+    values = np.fromfile(os.path.join(out_dir, index["files"]["f32"]), dtype=index["dtype"])
+    return Comparisons(index["states"], index["metrics"],
+                       values.reshape(index["shape"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two states from the snapshot.")
+    parser.add_argument("from_state")
+    parser.add_argument("to_state")
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    comparisons = read_comparisons(args.snapshot_dir)
+    if comparisons is None:
+        snapshot = read_static(SNAPSHOT_NAME, args.snapshot_dir)
+        if snapshot is None:
+            print(f"No states snapshot in {args.snapshot_dir}; run the ingest with --snapshot")
+            return
+        comparisons = compute_comparisons(snapshot["states"])
+    for state in (args.from_state, args.to_state):
+        if state not in comparisons.positions:
+            print(f"Unknown state: {state}")
+            return
+    print(f"{args.to_state} compared with {args.from_state}:")
+    for metric, (difference, percent) in comparisons.compare(args.from_state,
+                                                             args.to_state).items():
+        change = "" if np.isnan(percent) else f" ({percent:+.1f}%)"
+        print(f"  {metric:<26} {difference:>+16,.2f}{change}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""County-level sales and property tax rates, keyed by five-digit FIPS code.
+
+The state-level pipeline keeps one number per state from these workbooks. Here each
+county row becomes a CountyRecord (Fips, StateFips, State, County and the rates), for
+the Counties collection. Column positions vary between releases of the Tax Foundation
+files, so columns are found by their header text rather than by position: a FIPS
+column (five digits, or three with a separate state column) and a rate column.
+Sheets without county rows, like the state-only editions, contribute nothing.
+"""
+
+import os
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from loader import STATE_FIPS, STATES_BY_FIPS, normalize_state_name
+from metrics import METRICS
+from schema import COUNTY_SCHEMA
+from sheet_reader import iter_rows
+from state_record import COUNTY_FIELDS, CountyRecord
+from validation import Rule, duplicated, validate_frame
+
+# Rows searched for the header before giving up on a sheet
+HEADER_SCAN_ROWS = 20
+
+
+class CountySource:
+    """One workbook and the Counties field its rate column fills.
+
+    value_headers are the accepted headers of the rate column, most specific first.
+    """
+
+    def __init__(self, filename, field, value_headers, sheet=0):
+        self.filename = filename
+        self.field = field
+        self.value_headers = value_headers
+        self.sheet = sheet
+
+
+COUNTY_SOURCES = [
+    CountySource("Sales Tax by State and County.xlsx", "SalesTax",
+                 ["combined sales tax rate", "combined rate", "sales tax rate", "rate"]),
+    CountySource("Property Taxes by State and County, 2025  Tax Foundation Maps.xlsx",
+                 "PropertyTaxes",
+                 ["effective property tax rate", "effective tax rate", "property tax rate",
+                  "rate"]),
+]
+
+
+def header_key(cell):
+    return " ".join(str(cell).lower().split()) if isinstance(cell, str) else ""
+
+
+def find_columns(header, value_headers):
+    """Positions of the id, name and rate columns in a header row, or None."""
+    keys = [header_key(cell) for cell in header]
+
+    def find(predicate):
+        return next((i for i, key in enumerate(keys) if key and predicate(key)), None)
+
+    columns = {
+        "state_fips": find(lambda key: "fips" in key and "state" in key),
+        "fips": find(lambda key: "fips" in key and "state" not in key),
+        "state": find(lambda key: key in ("state", "state name")),
+        "county": find(lambda key: key in ("county", "county name", "county/city")),
+        "value": None,
+    }
+    for name in value_headers:
+        columns["value"] = find(lambda key: key == name)
+        if columns["value"] is None:
+            columns["value"] = find(lambda key: name in key and "fips" not in key)
+        if columns["value"] is not None:
+            break
+    if columns["fips"] is None or columns["value"] is None:
+        return None
+    return columns
+
+
+def digits(cell):
+    """A code cell as a digit string, or "" if it isn't one."""
+    if isinstance(cell, bool) or cell is None:
+        return ""
+    if isinstance(cell, (int, float)):
+        return str(int(cell)) if float(cell).is_integer() else ""
+    cell = str(cell).strip()
+    return cell if cell.isdigit() else ""
+
+
+def rate(cell):
+    """Rate cell to a percentage: the fraction 0.0725 and the text "7.25%" become 7.25."""
+    if isinstance(cell, str) and cell.strip().endswith("%"):
+        return float(cell.strip().rstrip("%"))
+    return float(cell) * 100
+
+
+def county_fips(row, columns):
+    """Five-digit FIPS code of a row, or None."""
+    def cell(name):
+        position = columns[name]
+        return row[position] if position is not None and position < len(row) else None
+
+    code = digits(cell("fips"))
+    if len(code) > 3:
+        return code.zfill(5)
+    if not code:
+        return None
+    state_code = digits(cell("state_fips"))
+    if state_code:
+        return state_code.zfill(2) + code.zfill(3)
+    state = normalize_state_name(cell("state"))
+    if state is None:
+        return None
+    return STATE_FIPS[state] + code.zfill(3)
+
+
+def parse_county_source(source, excel_dir):
+    """Parse one county workbook. Runs in a worker process.
+
+    Returns (source, {fips: {field: value}}, stats, seconds, error).
+    """
+    start = time.perf_counter()
+    values = {}
+    stats = {"rows": 0, "no_fips": 0, "state_totals": 0, "bad_value": 0}
+    try:
+        rows = iter_rows(os.path.join(excel_dir, source.filename), source.sheet)
+        columns = None
+        for i, row in enumerate(rows):
+            columns = find_columns(row, source.value_headers)
+            if columns is not None or i + 1 >= HEADER_SCAN_ROWS:
+                break
+        if columns is None:
+            return source, values, stats, time.perf_counter() - start, None
+        for row in rows:
+            stats["rows"] += 1
+            fips = county_fips(row, columns)
+            if fips is None:
+                stats["no_fips"] += 1
+                continue
+            if fips.endswith("000"):
+                # State rows carry the state's own rate; the States pipeline has those
+                stats["state_totals"] += 1
+                continue
+            try:
+                value = rate(row[columns["value"]])
+            except (IndexError, TypeError, ValueError):
+                stats["bad_value"] += 1
+                continue
+            county = row[columns["county"]] if columns["county"] is not None else None
+            fields = values.setdefault(fips, {})
+            fields[source.field] = value
+            if isinstance(county, str) and county.strip():
+                fields["County"] = " ".join(county.split())
+        return source, values, stats, time.perf_counter() - start, None
+    except Exception as e:
+        return source, {}, stats, time.perf_counter() - start, str(e)
+
+
+def build_county_records(excel_dir, workers=None, sources=COUNTY_SOURCES):
+    """One CountyRecord per county found in any source, sorted by FIPS code."""
+    start = time.perf_counter()
+    count = len(sources)
+    if workers == 1:
+        results = [parse_county_source(source, excel_dir) for source in sources]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse_county_source, sources, [excel_dir] * count))
+    merged = {}
+    for source, values, stats, seconds, error in results:
+        METRICS.observe("stage_seconds", seconds, stage="parse")
+        if error:
+            print(f"  {source.filename}: failed after {seconds:.2f}s: {error}")
+            continue
+        if not stats["rows"]:
+            print(f"  {source.filename}: no county columns found (state-level sheet)")
+            continue
+        skipped = stats["no_fips"] + stats["bad_value"]
+        print(f"  {source.filename}: {len(values)} counties in {seconds:.2f}s"
+              + (f", {skipped} rows skipped" if skipped else ""))
+        for fips, fields in values.items():
+            merged.setdefault(fips, {}).update(fields)
+
+    records = []
+    with METRICS.timer("stage_seconds", stage="map"):
+        for fips in sorted(merged):
+            fields = merged[fips]
+            record = CountyRecord(Fips=fips, StateFips=fips[:2])
+            state = STATES_BY_FIPS.get(fips[:2])
+            if state is not None:
+                record["State"] = state
+            for field in COUNTY_FIELDS[3:]:
+                if field in fields:
+                    record[field] = fields[field]
+            records.append(record)
+    print(f"Built {len(records)} counties from {count} sources "
+          f"in {time.perf_counter() - start:.2f}s")
+    return records
+
+
+COUNTY_RULES = [
+    Rule("duplicate", ["Fips"], lambda df: duplicated(df, "Fips"),
+         "county appears more than once; later rows are dropped"),
+    Rule("format", ["Fips"],
+         lambda df: df["Fips"].notna() & ~df["Fips"].astype(str).str.fullmatch(r"\d{5}"),
+         "not a five-digit FIPS code"),
+    Rule("state", ["Fips", "StateFips"],
+         lambda df: df["Fips"].astype(str).str[:2] != df["StateFips"].astype(str),
+         "FIPS code is not in its state"),
+]
+
+
+def validate_counties(records):
+    """Validate CountyRecords, returning (valid records, report)."""
+    with METRICS.timer("stage_seconds", stage="validate"):
+        df = pd.DataFrame([record.to_dict() for record in records], columns=COUNTY_FIELDS)
+        df = df.dropna(axis=1, how="all")
+        checked, report = validate_frame(df, schema=COUNTY_SCHEMA,
+                                         required=["Fips", "StateFips", "State", "County"],
+                                         rules=COUNTY_RULES, label="Fips")
+        valid = CountyRecord.from_frame(checked[~report.invalid], skip_missing=True)
+    METRICS.count("records_total", len(valid), stage="validate", outcome="valid")
+    METRICS.count("records_total", report.invalid_count, stage="validate",
+                  outcome="invalid")
+    return valid, report
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""In-process stand-in for the States API, for benchmarking the ingest without Mongo.
+
+Implements the routes the ingest uses (create, bulk, read, read/:id, update/:id)
+against in-memory States and Counties collections. Latency and failures can be
+injected, so batching, concurrency and retry behaviour can be compared reproducibly:
+
+    with FakeStatesServer(latency=0.02, error_rate=0.05, seed=1) as server:
+        client = StatesApiClient(server.base_url)
+        ...
+
+or run it standalone in place of the real server:
+
+    python fake_server.py --port 3002 --latency 0.02 --throttle-rate 0.1
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from state_record import COUNTY_FIELDS, DERIVED_FIELDS, STATE_FIELDS
+
+# resource -> (unique key field, model fields), as in server/models
+RESOURCES = {
+    "States": ("Name", STATE_FIELDS + DERIVED_FIELDS),
+    "Counties": ("Fips", COUNTY_FIELDS),
+}
+
+
+def route_name(method, path):
+    """Stats key for a request, e.g. "POST /api/States/update/:id"."""
+    parts = [part for part in path.split("/") if part]
+    if len(parts) > 3:
+        parts = parts[:3] + [":id"]
+    return f"{method} /{'/'.join(parts)}"
+
+
+class FakeStatesServer:
+    """A threaded HTTP server holding States documents in memory.
+
+    latency: seconds added to every request, plus up to `jitter` more at random.
+    error_rate: fraction of requests answered with a 500.
+    throttle_rate: fraction of requests answered with a 429 and Retry-After.
+    bulk: whether the bulk routes exist (False mimics older servers).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 throttle_rate=0.0, retry_after=0.05, bulk=True, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.bulk = bulk
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.documents = {resource: {} for resource in RESOURCES}  # _id -> document
+        self.stats = Counter()
+        self.httpd = ThreadingHTTPServer((host, port), self.handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def by_name(self, resource="States"):
+        """{key: document} of a collection, keyed by Name (States) or Fips (Counties)."""
+        key, _ = RESOURCES[resource]
+        with self.lock:
+            return {doc[key]: doc for doc in self.documents[resource].values()}
+
+    # Fault injection
+
+    def injected_fault(self):
+        """Sleep for the configured latency, then maybe pick a fault to return."""
+        with self.lock:
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            roll = self.random.random()
+        if delay > 0:
+            time.sleep(delay)
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 500
+        return None
+
+    # Route implementations, mirroring server/controllers
+
+    def create(self, resource, body):
+        key, fields = RESOURCES[resource]
+        documents = self.documents[resource]
+        with self.lock:
+            if any(doc[key] == body.get(key) for doc in documents.values()):
+                return 500, {"error": f"duplicate {key} {body.get(key)!r}"}
+            doc = {"_id": uuid.uuid4().hex[:24]}
+            doc.update({field: body.get(field) for field in fields})
+            documents[doc["_id"]] = doc
+            return 200, doc
+
+    def bulk_upsert(self, resource, body):
+        key, fields = RESOURCES[resource]
+        documents = self.documents[resource]
+        items = body.get(resource.lower()) or []
+        matched = upserted = 0
+        with self.lock:
+            existing = {doc[key]: doc for doc in documents.values()}
+            for item in items:
+                doc = existing.get(item.get(key))
+                if doc is None:
+                    doc = {"_id": uuid.uuid4().hex[:24]}
+                    documents[doc["_id"]] = doc
+                    existing[item.get(key)] = doc
+                    upserted += 1
+                else:
+                    matched += 1
+                doc.update({field: item.get(field) for field in fields})
+        return 200, {"matched": matched, "modified": matched, "upserted": upserted}
+
+    def read(self, resource, query):
+        key, _ = RESOURCES[resource]
+        page = int(query.get("page", ["0"])[0])
+        limit = int(query.get("limit", ["55"])[0])
+        with self.lock:
+            docs = sorted(self.documents[resource].values(), key=lambda doc: str(doc.get(key)))
+        return 200, {
+            "data": docs[page * limit:(page + 1) * limit],
+            "total": len(docs),
+            "page": page,
+            "totalPages": math.ceil(len(docs) / limit) if limit else 0,
+        }
+
+    def read_one(self, resource, doc_id):
+        with self.lock:
+            return 200, self.documents[resource].get(doc_id)
+
+    def update(self, resource, doc_id, body):
+        _, fields = RESOURCES[resource]
+        with self.lock:
+            doc = self.documents[resource].get(doc_id)
+            if doc is None:
+                return 200, None
+            doc.update({field: body.get(field) for field in fields})
+            return 200, doc
+
+    def route(self, method, path, query, body):
+        parts = [part for part in path.split("/") if part]
+        if len(parts) < 3 or parts[0] != "api" or parts[1] not in RESOURCES:
+            return 404, {"error": "not found"}
+        resource, action, rest = parts[1], parts[2], parts[3:]
+        if method == "POST" and action == "create" and not rest:
+            return self.create(resource, body)
+        if method == "POST" and action == "bulk" and not rest and self.bulk:
+            return self.bulk_upsert(resource, body)
+        if method == "GET" and action == "read" and not rest:
+            return self.read(resource, query)
+        if method == "GET" and action == "read" and len(rest) == 1:
+            return self.read_one(resource, rest[0])
+        if method == "POST" and action == "update" and len(rest) == 1:
+            return self.update(resource, rest[0], body)
+        return 404, {"error": "not found"}
+
+    def handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def respond(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def handle_method(self, method):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                with server.lock:
+                    server.stats[route_name(method, url.path)] += 1
+                fault = server.injected_fault()
+                if fault == 429:
+                    with server.lock:
+                        server.stats["429"] += 1
+                    return self.respond(429, {"error": "throttled"},
+                                        {"Retry-After": str(server.retry_after)})
+                if fault == 500:
+                    with server.lock:
+                        server.stats["500"] += 1
+                    return self.respond(500, {"error": "injected failure"})
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    return self.respond(400, {"error": "invalid json"})
+                status, payload = server.route(method, url.path, parse_qs(url.query), body)
+                self.respond(status, payload)
+
+            def do_GET(self):
+                self.handle_method("GET")
+
+            def do_POST(self):
+                self.handle_method("POST")
+
+        return Handler
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run an in-memory stand-in for the States API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3002)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random seconds, up to")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0,
+                        help="fraction answered 429 with Retry-After")
+    parser.add_argument("--no-bulk", action="store_true", help="disable the bulk routes")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    server = FakeStatesServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                              error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                              bulk=not args.no_bulk, seed=args.seed)
+    print(f"Fake States API listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(dict(server.stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Write-ahead journal of per-record send outcomes, so an interrupted ingest can resume.
+
+Every outcome is appended (and flushed) as one JSON line the moment it is known.
+A record is identified by a hash of its contents plus its key: the Name of a state,
+the FIPS code of a county. A rerun therefore skips records an earlier run already
+confirmed but re-sends any whose data changed.
+When a run finishes with no failures the journal is marked complete, and the next
+run starts from an empty journal.
+"""
+
+import json
+import os
+import time
+
+from manifest import records_hash
+
+
+def record_name(record):
+    """States are identified by Name, counties by FIPS code."""
+    return record.get("Name", record.get("Fips"))
+
+
+def record_key(record):
+    contents = {k: v for k, v in record.items() if k != "_id"}
+    return f"{record_name(record)}:{records_hash([contents])}"
+
+
+class Journal:
+    def __init__(self, path):
+        self.path = path
+        self.confirmed = set()
+        self.load()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.file = open(path, "a")
+        if self.file.tell() > 0:
+            # Never append onto a torn line
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self.file.write("\n")
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        finished = False
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash mid-write can leave a torn last line
+                    continue
+                finished = bool(entry.get("complete"))
+                if finished:
+                    self.confirmed.clear()
+                elif entry.get("ok"):
+                    self.confirmed.add(entry["key"])
+        if finished:
+            # The last run went through; start this one with an empty journal
+            os.remove(self.path)
+
+    def is_confirmed(self, record):
+        return record_key(record) in self.confirmed
+
+    def write(self, record, ok, detail=""):
+        entry = {"key": record_key(record), "name": record_name(record), "ok": ok,
+                 "time": time.time()}
+        if detail:
+            entry["detail"] = detail
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+        if ok:
+            self.confirmed.add(entry["key"])
+
+    def complete(self):
+        """Mark the run as finished so the next one starts fresh."""
+        self.file.write(json.dumps({"complete": True, "time": time.time()}) + "\n")
+        self.close()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+
+
+def send_with_journal(client, records, journal, retries=3, base_delay=1.0):
+    """client.send() that skips confirmed records and retries failures.
+
+    Failed records are retried as a group, up to `retries` more times, waiting
+    base_delay * 2**n seconds before each round. Yields (record, ok, detail) once
+    per record that needed sending; failures are yielded after the last round.
+    """
+    pending = [record for record in records if not journal.is_confirmed(record)]
+    if len(pending) < len(records):
+        print(f"Resuming: {len(records) - len(pending)} records were already sent "
+              f"by an earlier run")
+    failed = []
+    for attempt in range(retries + 1):
+        if attempt:
+            delay = base_delay * 2 ** (attempt - 1)
+            print(f"Retrying {len(pending)} failed records in {delay:.1f}s...")
+            time.sleep(delay)
+        failed = []
+        for record, ok, detail in client.send(pending):
+            journal.write(record, ok, detail)
+            if ok:
+                yield record, True, ""
+            else:
+                failed.append((record, detail))
+        pending = [record for record, _ in failed]
+        if not pending:
+            break
+    for record, detail in failed:
+        yield record, False, detail
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Parse the state-info workbooks in parallel and merge them into one record per state."""
+
+import os
+import re
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from manifest import file_hash
+from sheet_cache import SheetCache
+from sheet_reader import read_columns
+
+US_STATES = [
+    "Alabama", "Alaska", "Arizona", "Arkansas", "California", "Colorado", "Connecticut",
+    "Delaware", "District of Columbia", "Florida", "Georgia", "Hawaii", "Idaho", "Illinois",
+    "Indiana", "Iowa", "Kansas", "Kentucky", "Louisiana", "Maine", "Maryland",
+    "Massachusetts", "Michigan", "Minnesota", "Mississippi", "Missouri", "Montana",
+    "Nebraska", "Nevada", "New Hampshire", "New Jersey", "New Mexico", "New York",
+    "North Carolina", "North Dakota", "Ohio", "Oklahoma", "Oregon", "Pennsylvania",
+    "Rhode Island", "South Carolina", "South Dakota", "Tennessee", "Texas", "Utah",
+    "Vermont", "Virginia", "Washington", "West Virginia", "Wisconsin", "Wyoming",
+]
+
+# Spellings used by the source workbooks for states in US_STATES
+STATE_ALIASES = {
+    "Washington D.C.": "District of Columbia",
+    "Washington DC": "District of Columbia",
+    "D.C.": "District of Columbia",
+    "DC": "District of Columbia",
+}
+
+KNOWN_STATES = set(US_STATES)
+
+# Two-digit FIPS code of each state, the prefix of its counties' five-digit codes
+STATE_FIPS = {
+    "Alabama": "01", "Alaska": "02", "Arizona": "04", "Arkansas": "05", "California": "06",
+    "Colorado": "08", "Connecticut": "09", "Delaware": "10", "District of Columbia": "11",
+    "Florida": "12", "Georgia": "13", "Hawaii": "15", "Idaho": "16", "Illinois": "17",
+    "Indiana": "18", "Iowa": "19", "Kansas": "20", "Kentucky": "21", "Louisiana": "22",
+    "Maine": "23", "Maryland": "24", "Massachusetts": "25", "Michigan": "26",
+    "Minnesota": "27", "Mississippi": "28", "Missouri": "29", "Montana": "30",
+    "Nebraska": "31", "Nevada": "32", "New Hampshire": "33", "New Jersey": "34",
+    "New Mexico": "35", "New York": "36", "North Carolina": "37", "North Dakota": "38",
+    "Ohio": "39", "Oklahoma": "40", "Oregon": "41", "Pennsylvania": "42",
+    "Rhode Island": "44", "South Carolina": "45", "South Dakota": "46", "Tennessee": "47",
+    "Texas": "48", "Utah": "49", "Vermont": "50", "Virginia": "51", "Washington": "53",
+    "West Virginia": "54", "Wisconsin": "55", "Wyoming": "56",
+}
+STATES_BY_FIPS = {fips: state for state, fips in STATE_FIPS.items()}
+
+
+def normalize_state_name(value):
+    """Map a cell to a name in US_STATES, or None if it isn't a state.
+
+    Strips footnote markers ("California * †") and resolves aliases.
+    """
+    if not isinstance(value, str):
+        return None
+    name = re.sub(r"[*†‡§¹²³]", "", value)
+    name = " ".join(name.split())
+    name = STATE_ALIASES.get(name, name)
+    return name if name in KNOWN_STATES else None
+
+
+def read_workbook(path, cache_dir=None):
+    """Read the first sheet of a workbook with no header row.
+
+    Goes through sheet_reader, as sources.py does, so --parse accepts the same
+    workbooks as the ingest.
+    """
+    if cache_dir is None:
+        return read_columns(path)
+    return SheetCache(cache_dir).read(path, read_columns, file_hash(path))
+
+
+def sheet_to_states(df, default_column):
+    """Turn a sheet whose first column is the state name into {state: {column: value}}.
+
+    If the first row names a state, the sheet has no header row and its single value
+    column is named default_column.
+    """
+    if df.empty:
+        return {}
+    first_row = df.iloc[0]
+    if normalize_state_name(first_row.iloc[0]) is None:
+        headers = [default_column if pd.isna(h) else " ".join(str(h).split())
+                   for h in first_row]
+        body = df.iloc[1:]
+    else:
+        headers = [None, default_column] + [f"{default_column} {i}"
+                                            for i in range(2, df.shape[1])]
+        headers = headers[:df.shape[1]]
+        body = df
+    body = body.set_axis(headers, axis=1)
+    names = body.iloc[:, 0].map(normalize_state_name)
+    body = body[names.notna()].iloc[:, 1:].dropna(axis=1, how="all")
+    body.index = names[names.notna()]
+    body = body.astype(object).where(body.notna(), None)
+    return body.to_dict("index")
+
+
+def parse_workbook(path, cache_dir=None):
+    """Parse one workbook. Runs in a worker process.
+
+    Returns (path, {state: {column: value}}, seconds, error).
+    """
+    start = time.perf_counter()
+    try:
+        df = read_workbook(path, cache_dir)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        states = sheet_to_states(df, stem)
+        return path, states, time.perf_counter() - start, None
+    except Exception as e:
+        return path, {}, time.perf_counter() - start, str(e)
+
+
+def merge_workbooks(results):
+    """Merge parse_workbook results into {state: {"<file>/<column>": value}}."""
+    merged = {}
+    for path, states, _, error in results:
+        if error:
+            continue
+        stem = os.path.splitext(os.path.basename(path))[0]
+        for state, values in states.items():
+            record = merged.setdefault(state, {"Name": state})
+            for column, value in values.items():
+                record[f"{stem}/{column}"] = value
+    return merged
+
+
+def load_workbooks(paths, workers=None, cache_dir=None):
+    """Parse workbooks across a process pool and return (merged, results).
+
+    Prints how long each file took and which ones failed.
+    """
+    start = time.perf_counter()
+    if workers == 1 or len(paths) < 2:
+        results = [parse_workbook(path, cache_dir) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse_workbook, paths, [cache_dir] * len(paths)))
+    for path, states, seconds, error in results:
+        name = os.path.basename(path)
+        if error:
+            print(f"  {name}: failed after {seconds:.2f}s: {error}")
+        else:
+            print(f"  {name}: {len(states)} states in {seconds:.2f}s")
+    merged = merge_workbooks(results)
+    print(f"Parsed {len(paths)} files into {len(merged)} states "
+          f"in {time.perf_counter() - start:.2f}s")
+    return merged, results
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Manifest of source spreadsheets that have already been synced.
+
+Each entry records the file's size, mtime and content hash, plus a hash of the
+records parsed from it, as of the last successful sync. Unchanged files can then
+be skipped without being parsed again.
+"""
+
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """sha256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def encode_value(value):
+    """json.dumps fallback: StateRecords as dicts, anything else as its string."""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return str(value)
+
+
+def records_hash(records):
+    """sha256 of a list of records, independent of dict key order."""
+    payload = json.dumps(records, sort_keys=True, default=encode_value, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Manifest:
+    """Tracks which source files have been synced, keyed by absolute path."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: ignoring unreadable manifest {self.path}: {str(e)}")
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.entries = data.get("files", {})
+
+    def save(self):
+        """Write the manifest atomically so a crash never leaves it half-written."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.entries}, f, indent=2,
+                      sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def key(path):
+        return os.path.abspath(path)
+
+    def content_hash(self, path):
+        """Content hash of path, reusing the stored hash when size and mtime match."""
+        entry = self.entries.get(self.key(path))
+        stat = os.stat(path)
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            return entry["sha256"]
+        return file_hash(path)
+
+    def is_unchanged(self, path):
+        """True if path has the same contents as when it was last synced."""
+        entry = self.entries.get(self.key(path))
+        return entry is not None and entry["sha256"] == self.content_hash(path)
+
+    def records_unchanged(self, path, parsed_hash):
+        """True if the records parsed from path match the ones last synced."""
+        entry = self.entries.get(self.key(path))
+        return entry is not None and entry.get("records_sha256") == parsed_hash
+
+    def update(self, path, parsed_hash):
+        """Record path as successfully synced with the given parsed-record hash."""
+        stat = os.stat(path)
+        self.entries[self.key(path)] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": file_hash(path),
+            "records_sha256": parsed_hash,
+        }
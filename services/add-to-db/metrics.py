@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Counters and timing histograms for the ingest stages.
+
+Stages record into the module-level METRICS registry:
+
+    with METRICS.timer("stage_seconds", stage="validate"):
+        ...
+    METRICS.count("records_total", stage="send", outcome="ok")
+
+The registry can be written as JSON or in the Prometheus text exposition format
+(for a node_exporter textfile collector or a pushgateway), and profiled() wraps a
+block in cProfile when a deeper look is needed.
+"""
+
+import cProfile
+import json
+import math
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds, in seconds, of the histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+PROMETHEUS_PREFIX = "ingest_"
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        """[(upper bound, observations <= bound)], ending with +Inf."""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        result.append((math.inf, self.count))
+        return result
+
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{str(value)}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+class Metrics:
+    """A thread-safe registry of labelled counters and histograms."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> Histogram
+
+    def count(self, name, value=1, **labels):
+        key = (name, label_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, label_key(labels))
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe how long the with-block took, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, iterable, name, **labels):
+        """Yield from iterable, observing how long producing each item took."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.observe(name, time.perf_counter() - start, **labels)
+            yield item
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def to_dict(self):
+        with self.lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            histograms = [{"name": name, "labels": dict(labels), "count": h.count,
+                           "sum": round(h.sum, 6),
+                           "buckets": {("+Inf" if math.isinf(bound) else str(bound)): count
+                                       for bound, count in h.cumulative()}}
+                          for (name, labels), h in sorted(self.histograms.items())]
+        return {"created": time.time(), "counters": counters, "histograms": histograms}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self, prefix=PROMETHEUS_PREFIX):
+        """The registry in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            typed = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                metric = prefix + name
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} counter")
+                    typed.add(metric)
+                lines.append(f"{metric}{format_labels(labels)} {value}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                metric = prefix + name
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} histogram")
+                    typed.add(metric)
+                for bound, count in h.cumulative():
+                    le = "+Inf" if math.isinf(bound) else str(bound)
+                    lines.append(f"{metric}_bucket{format_labels(labels + (('le', le),))} "
+                                 f"{count}")
+                lines.append(f"{metric}_sum{format_labels(labels)} {h.sum}")
+                lines.append(f"{metric}_count{format_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the registry to path; a .prom extension selects Prometheus format."""
+        text = self.to_prometheus() if path.endswith(".prom") else self.to_json()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        partial = f"{path}.partial"
+        with open(partial, "w") as f:
+            f.write(text)
+        # Scrapers may read the file at any moment; never let them see half of it
+        os.replace(partial, path)
+
+    def print_summary(self, name="stage_seconds", label="stage"):
+        """Print the total time and call count of each value of `label`."""
+        with self.lock:
+            rows = [(dict(labels).get(label), h) for (metric, labels), h
+                    in sorted(self.histograms.items()) if metric == name]
+        if not rows:
+            return
+        print("Time per stage:")
+        for value, h in rows:
+            print(f"  - {value}: {h.sum:.2f}s over {h.count} calls")
+
+
+METRICS = Metrics()
+
+
+@contextmanager
+def profiled(path=None, top=20):
+    """Run the with-block under cProfile.
+
+    Prints the `top` most expensive functions by cumulative time, and saves the raw
+    stats to path (for snakeviz or pstats) when one is given.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+            print(f"Saved profile to {path}")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""What moving between any two states does to a household's finances, all at once.
+
+The client's moving calculator works out one from/to pair at a time in the browser.
+compute_moving_costs() does the same arithmetic for every ordered pair of states,
+across a grid of incomes and savings rates, as numpy arrays indexed
+[from state, to state, income, savings rate]. Each component is the yearly amount
+the household keeps by moving, so positive numbers are savings:
+
+    income tax     tax in the old state - tax in the new one
+    sales tax      taxable spending (half of what isn't saved) x the rate difference
+    property tax   house value x the rate difference
+    cost of living spending x (1 - new index / old index)
+
+Income tax comes from the bracket tables when they are exact, and otherwise from
+the share-of-top-rate estimate the client uses. The published table holds the total
+for every move and grid point, so "best states to move to from X at income Y" is
+one lookup.
+"""
+
+import argparse
+import numpy as np
+
+from analytics import numeric_matrix
+from brackets import BRACKETS_NAME, tables_from_payload
+from manifest import records_hash
+from metrics import METRICS
+from snapshot import SNAPSHOT_DIR, SNAPSHOT_NAME, SNAPSHOT_VERSION, read_static, write_static
+
+MOVING_COSTS_NAME = "moving-costs"
+# The grid the table is computed over
+INCOMES = [30000, 50000, 75000, 105000, 150000, 200000, 300000, 500000]
+SAVINGS_RATES = [0, 10, 20, 30]  # percent of income
+HOUSE_VALUE = 200000  # the calculator's default
+# Share of spending that goes on sales-taxable goods
+SALES_SHARE_OF_CONSUMPTION = 0.5
+# Effective income tax as a share of the top rate, by income, when brackets are unknown
+EFFECTIVE_RATE_BOUNDS = [50000, 100000, 200000, 500000]
+EFFECTIVE_RATE_SHARES = [0.25, 0.45, 0.52, 0.65, 0.80]
+
+
+def estimated_income_taxes(top_rates, incomes):
+    """[state, income] tax from top marginal rates (percent), as the client estimates it."""
+    shares = np.asarray(EFFECTIVE_RATE_SHARES)[
+        np.searchsorted(EFFECTIVE_RATE_BOUNDS, incomes, side="left")]
+    return (top_rates[:, None] / 100) * (incomes * shares)[None, :]
+
+
+def income_taxes(names, top_rates, incomes, brackets=None, status="single"):
+    """[state, income] state income tax. Returns (taxes, exact)."""
+    taxes = estimated_income_taxes(top_rates, incomes)
+    if brackets is None:
+        return taxes, False
+    tables, exact = brackets
+    if not exact:
+        # A flat schedule at the top rate overstates tax more than the estimate does
+        return taxes, False
+    for i, name in enumerate(names):
+        if name in tables:
+            taxes[i] = tables[name][status].tax_many(incomes)
+    return taxes, True
+
+
+class MovingCosts:
+    """Yearly savings from moving, per component, over the state x state x grid cube.
+
+    incomeTax is [from, to, income], propertyTax [from, to], and salesTax,
+    costOfLiving and total [from, to, income, savings rate].
+    """
+
+    def __init__(self, states, incomes, savings_rates, house_value, components, exact):
+        self.states = states
+        self.incomes = incomes
+        self.savings_rates = savings_rates
+        self.house_value = house_value
+        self.components = components
+        self.exact = exact
+        self.total = (components["incomeTax"][:, :, :, None]
+                      + components["salesTax"]
+                      + components["propertyTax"][:, :, None, None]
+                      + components["costOfLiving"])
+        self.positions = {state: i for i, state in enumerate(states)}
+
+    def grid_position(self, income, savings_rate):
+        """Indices of the grid point nearest an income and savings rate."""
+        return (int(np.abs(self.incomes - income).argmin()),
+                int(np.abs(self.savings_rates - savings_rate).argmin()))
+
+    def lookup(self, from_state, to_state, income, savings_rate):
+        """{component: savings} of one move, at the nearest grid point."""
+        i, j = self.positions[from_state], self.positions[to_state]
+        k, r = self.grid_position(income, savings_rate)
+        result = {
+            "incomeTax": self.components["incomeTax"][i, j, k],
+            "salesTax": self.components["salesTax"][i, j, k, r],
+            "propertyTax": self.components["propertyTax"][i, j],
+            "costOfLiving": self.components["costOfLiving"][i, j, k, r],
+            "total": self.total[i, j, k, r],
+        }
+        return {name: float(value) for name, value in result.items()}
+
+    def best_moves(self, from_state, income, savings_rate, top=10):
+        """[(state, yearly savings)] of the `top` best destinations from a state."""
+        i = self.positions[from_state]
+        k, r = self.grid_position(income, savings_rate)
+        savings = self.total[i, :, k, r]
+        order = [j for j in np.argsort(-savings, kind="stable") if j != i][:top]
+        return [(self.states[j], float(savings[j])) for j in order]
+
+    def to_payload(self, etag):
+        def dollars(array):
+            return np.rint(array).astype(int).tolist()
+
+        return {
+            "version": SNAPSHOT_VERSION,
+            "etag": etag,
+            "states": self.states,
+            "incomes": self.incomes.tolist(),
+            "savingsRates": self.savings_rates.tolist(),
+            "houseValue": self.house_value,
+            "exactIncomeTax": self.exact,
+            # [from][to][income][savings rate]; the components stay in Python, as
+            # publishing them too would quadruple the file
+            "total": dollars(self.total),
+        }
+
+
+def compute_moving_costs(records, incomes=INCOMES, savings_rates=SAVINGS_RATES,
+                         house_value=HOUSE_VALUE, brackets=None):
+    """Build a MovingCosts for every ordered pair of the records' states."""
+    with METRICS.timer("stage_seconds", stage="analyze"):
+        records = sorted(records, key=lambda record: str(record.get("Name")))
+        states = [record.get("Name") for record in records]
+        incomes = np.asarray(incomes, dtype=float)
+        savings_rates = np.asarray(savings_rates, dtype=float)
+        income_tax, sales_tax, property_tax, cost_of_living = numeric_matrix(
+            records, ["IncomeTax", "SalesTax", "PropertyTaxes", "CostOfLiving"]).T
+
+        taxes, exact = income_taxes(states, income_tax, incomes, brackets)
+        # [income, savings rate]
+        spending = incomes[:, None] * (1 - savings_rates[None, :] / 100)
+        # [from, to] ratios of the new cost of living to the old; 1 where unknown
+        known = (cost_of_living[:, None] > 0) & (cost_of_living[None, :] > 0)
+        ratio = np.divide(cost_of_living[None, :], cost_of_living[:, None],
+                          out=np.ones((len(states), len(states))), where=known)
+        components = {
+            "incomeTax": taxes[:, None, :] - taxes[None, :, :],
+            "salesTax": ((sales_tax[:, None] - sales_tax[None, :]) / 100)[:, :, None, None]
+            * (spending * SALES_SHARE_OF_CONSUMPTION)[None, None, :, :],
+            "propertyTax": (property_tax[:, None] - property_tax[None, :]) / 100 * house_value,
+            "costOfLiving": (1 - ratio)[:, :, None, None] * spending[None, None, :, :],
+        }
+        return MovingCosts(states, incomes, savings_rates, house_value, components, exact)
+
+
+def write_moving_costs(costs, out_dir, use_msgpack=False):
+    """Publish the table next to the states snapshot. Returns the index dict."""
+    payload = costs.to_payload(None)
+    etag = records_hash([payload])[:16]
+    payload["etag"] = etag
+    return write_static(MOVING_COSTS_NAME, payload, etag, len(costs.states), out_dir,
+                        use_msgpack)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="List the best states to move to, from the published snapshot.")
+    parser.add_argument("from_state")
+    parser.add_argument("--income", type=float, default=105000)
+    parser.add_argument("--savings-rate", type=float, default=20)
+    parser.add_argument("--house-value", type=float, default=HOUSE_VALUE)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    snapshot = read_static(SNAPSHOT_NAME, args.snapshot_dir)
+    if snapshot is None:
+        print(f"No states snapshot in {args.snapshot_dir}; run the ingest with --snapshot")
+        return
+    brackets = read_static(BRACKETS_NAME, args.snapshot_dir)
+    costs = compute_moving_costs(snapshot["states"], house_value=args.house_value,
+                                 brackets=tables_from_payload(brackets) if brackets else None)
+    if args.from_state not in costs.positions:
+        print(f"Unknown state: {args.from_state}")
+        return
+    k, r = costs.grid_position(args.income, args.savings_rate)
+    print(f"Best moves from {args.from_state} at ${costs.incomes[k]:,.0f} income, "
+          f"{costs.savings_rates[r]:.0f}% saved (yearly savings):")
+    for state, savings in costs.best_moves(args.from_state, args.income, args.savings_rate,
+                                           args.top):
+        print(f"  {state:<22} {savings:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Rank states by any weighting of the numeric States fields.
+
+AffordabilityScore is one fixed weighting. A RankingEngine normalizes every numeric
+field once per dataset version (z-scores or min-max), turned so that higher is
+better for every field, e.g. lower taxes and crime, more forest. A ranking for any
+weights is then a single matrix-vector product, and rank_many() ranks a whole batch
+of weight vectors with one matrix product.
+
+engine_for() keeps one engine per dataset version and method, so callers never
+normalize the same data twice. write_rankings() publishes the normalized matrices
+next to the states snapshot, so the API or the client can rank without a scan.
+"""
+
+import argparse
+import numpy as np
+
+from analytics import column_scale, numeric_matrix
+from manifest import records_hash
+from metrics import METRICS
+from schema import STATE_SCHEMA
+from snapshot import (SNAPSHOT_DIR, SNAPSHOT_NAME, SNAPSHOT_VERSION, read_static,
+                      snapshot_etag, write_static)
+
+RANKINGS_NAME = "rankings"
+# The numeric fields read from the workbooks, in model order
+RANK_FIELDS = [field for field, spec in STATE_SCHEMA.items() if spec.kind != "category"]
+# Fields where a lower value is better. School performance fields are ranks (1 is
+# best); Population counts against a state, as on the compare page.
+LOWER_IS_BETTER = {
+    "MedianHomePrice", "CapitalGainsTax", "IncomeTax", "SalesTax", "PropertyTaxes",
+    "CostOfLiving", "K12SchoolPerformance", "HigherEdSchoolPerformance", "Population",
+    "ViolentCrimes",
+}
+METHODS = ["zscore", "minmax"]
+
+# (dataset version, method) -> RankingEngine
+ENGINES = {}
+
+
+def normalize(values, method="zscore"):
+    """Scale each column of values; missing values take the column's mean first."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown normalization method: {method}")
+    if not len(values):
+        return values
+    means, deviations = column_scale(values)
+    values = np.where(np.isnan(values), means, values)
+    if method == "zscore":
+        centre, spread = means, deviations
+    else:
+        centre, spread = values.min(axis=0), values.max(axis=0) - values.min(axis=0)
+    # A column with no spread says nothing about any state
+    return np.divide(values - centre, spread, out=np.zeros_like(values), where=spread > 0)
+
+
+class RankingEngine:
+    """Normalized, higher-is-better features of one version of the dataset."""
+
+    def __init__(self, records, method="zscore", fields=RANK_FIELDS):
+        self.version = snapshot_etag(records)
+        records = sorted(records, key=lambda record: str(record.get("Name")))
+        self.method = method
+        self.fields = list(fields)
+        self.states = [record.get("Name") for record in records]
+        with METRICS.timer("stage_seconds", stage="analyze"):
+            signs = np.array([-1.0 if field in LOWER_IS_BETTER else 1.0
+                              for field in self.fields])
+            self.features = normalize(numeric_matrix(records, self.fields, missing=np.nan),
+                                      method) * signs
+
+    def weight_vector(self, weights):
+        """weights as an array in field order, from {field: weight} or a sequence."""
+        if hasattr(weights, "items"):
+            unknown = [field for field in weights if field not in self.fields]
+            if unknown:
+                raise ValueError(f"Unknown ranking fields: {', '.join(unknown)}")
+            return np.array([float(weights.get(field, 0)) for field in self.fields])
+        vector = np.asarray(weights, dtype=float)
+        if vector.shape != (len(self.fields),):
+            raise ValueError(f"Expected {len(self.fields)} weights, got {vector.shape}")
+        return vector
+
+    def scores(self, weights):
+        """Each state's score for one set of weights; higher is better."""
+        return self.features @ self.weight_vector(weights)
+
+    def rank(self, weights, top=None):
+        """[(state, score)] best first."""
+        scores = self.scores(weights)
+        order = np.argsort(-scores, kind="stable")[:top]
+        return [(self.states[i], float(scores[i])) for i in order]
+
+    def scores_many(self, weight_vectors):
+        """[weight vector, state] scores for a batch of weights, in one product."""
+        matrix = np.stack([self.weight_vector(weights) for weights in weight_vectors])
+        return matrix @ self.features.T
+
+    def rank_many(self, weight_vectors, top=None):
+        """rank() of every weight vector in a batch."""
+        scores = self.scores_many(weight_vectors)
+        orders = np.argsort(-scores, axis=1, kind="stable")[:, :top]
+        return [[(self.states[i], float(row[i])) for i in order]
+                for row, order in zip(scores, orders)]
+
+
+def engine_for(records, method="zscore"):
+    """The RankingEngine for this version of the records, built on first use.
+
+    The version is the states snapshot's ETag, so it names the snapshot the
+    features were computed from.
+    """
+    key = (snapshot_etag(records), method)
+    if key not in ENGINES:
+        ENGINES[key] = RankingEngine(records, method)
+    return ENGINES[key]
+
+
+def write_rankings(records, out_dir, use_msgpack=False):
+    """Publish the normalized features, for every method, next to the states snapshot."""
+    engines = [engine_for(records, method) for method in METHODS]
+    payload = {
+        "version": SNAPSHOT_VERSION,
+        "etag": None,
+        "dataset": engines[0].version,
+        "states": engines[0].states,
+        "fields": engines[0].fields,
+        "lowerIsBetter": sorted(LOWER_IS_BETTER & set(engines[0].fields)),
+        # [state][field]; score = features . weights
+        "features": {engine.method: np.round(engine.features, 6).tolist()
+                     for engine in engines},
+    }
+    etag = records_hash([payload])[:16]
+    payload["etag"] = etag
+    return write_static(RANKINGS_NAME, payload, etag, len(engines[0].states), out_dir,
+                        use_msgpack)
+
+
+def parse_weight(text):
+    field, _, weight = text.partition("=")
+    return field, float(weight or 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rank the states in the published snapshot by weighted fields.")
+    parser.add_argument("--weight", action="append", type=parse_weight, default=[],
+                        metavar="FIELD=WEIGHT",
+                        help=f"weight of a field, higher meaning it matters more; any of "
+                             f"{', '.join(RANK_FIELDS)}")
+    parser.add_argument("--method", choices=METHODS, default="zscore")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    snapshot = read_static(SNAPSHOT_NAME, args.snapshot_dir)
+    if snapshot is None:
+        print(f"No states snapshot in {args.snapshot_dir}; run the ingest with --snapshot")
+        return
+    weights = dict(args.weight) or {field: 1 for field in RANK_FIELDS}
+    try:
+        ranked = engine_for(snapshot["states"], args.method).rank(weights, args.top)
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        return
+    for place, (state, score) in enumerate(ranked, 1):
+        print(f"  {place:>2}. {state:<22} {score:+.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Types, ranges and allowed values of the States (and Counties) fields, applied once
+at ingest time."""
+
+import math
+
+from loader import KNOWN_STATES, STATE_FIPS
+
+GRADES = [
+    "A+", "A", "A-", "B+", "B", "B-", "C+", "C", "C-", "D+", "D", "D-", "F",
+]
+POLITICAL_LEANINGS = ["Dark Red", "Light Red", "Purple", "Light Blue", "Dark Blue"]
+
+
+class Field:
+    """How one States field is typed and checked.
+
+    kind is "number", "integer" or "category". decimals is how many places string
+    output keeps, so --string-values reproduces the historical "221490.00" format.
+    text lists non-numeric values a numeric field may also hold.
+    """
+
+    def __init__(self, kind, minimum=None, maximum=None, decimals=None, choices=None,
+                 text=()):
+        self.kind = kind
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decimals = decimals
+        self.choices = choices
+        self.text = set(text)
+
+    def coerce(self, value):
+        """Return the typed value, or raise ValueError if it is invalid."""
+        if self.kind == "category":
+            value = " ".join(str(value).split())
+            if self.choices is not None and value not in self.choices:
+                raise ValueError(f"{value!r} is not one of {', '.join(sorted(self.choices))}")
+            return value
+        if isinstance(value, str):
+            stripped = " ".join(value.split())
+            if stripped in self.text:
+                return stripped
+            value = stripped
+        number = float(value)
+        if math.isnan(number) or math.isinf(number):
+            raise ValueError(f"{value!r} is not a number")
+        if self.minimum is not None and number < self.minimum:
+            raise ValueError(f"{number} is below {self.minimum}")
+        if self.maximum is not None and number > self.maximum:
+            raise ValueError(f"{number} is above {self.maximum}")
+        if self.kind == "integer":
+            return int(round(number))
+        return round(number, self.decimals) if self.decimals is not None else number
+
+    def to_string(self, value):
+        """The string form the States collection historically stored."""
+        if isinstance(value, str):
+            return value
+        if self.kind == "integer":
+            return str(value)
+        if self.decimals is not None:
+            return f"{value:.{self.decimals}f}"
+        return str(value)
+
+
+STATE_SCHEMA = {
+    "MedianHomePrice": Field("number", 0, 10_000_000, decimals=2),
+    "CapitalGainsTax": Field("number", 0, 100, decimals=2),
+    "IncomeTax": Field("number", 0, 100, decimals=2),
+    "SalesTax": Field("number", 0, 100, decimals=2),
+    "PropertyTaxes": Field("number", 0, 100, decimals=2),
+    "Abortion": Field("category", choices=set(GRADES)),
+    "CostOfLiving": Field("number", 0, 1000, decimals=1),
+    "K12SchoolPerformance": Field("integer", 1, len(KNOWN_STATES)),
+    "HigherEdSchoolPerformance": Field("integer", 1, len(KNOWN_STATES)),
+    "ForestedLand": Field("number", 0, 100, decimals=2),
+    "GunLaws": Field("category", choices=set(GRADES)),
+    "MinimumWage": Field("number", 0, 100, decimals=2, text=["No state law"]),
+    "Population": Field("integer", 0, 1_000_000_000),
+    "ViolentCrimes": Field("number", 0, 100_000, decimals=1),
+    "PoliticalLeaning": Field("category", choices=set(POLITICAL_LEANINGS)),
+    "Name": Field("category", choices=KNOWN_STATES),
+}
+
+COUNTY_SCHEMA = {
+    "Fips": Field("category"),
+    "StateFips": Field("category", choices=set(STATE_FIPS.values())),
+    "State": Field("category", choices=KNOWN_STATES),
+    "County": Field("category"),
+    "SalesTax": Field("number", 0, 100, decimals=2),
+    "PropertyTaxes": Field("number", 0, 100, decimals=2),
+}
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""On-disk cache of parsed spreadsheets.
+
+pd.read_excel on .xlsx/.ods files is slow, so each parsed sheet is stored as a
+Feather file (or a pickle when pyarrow isn't installed, or the frame has mixed
+column types Arrow can't store) keyed by the source file's content hash. Later
+runs load the binary copy instead of parsing the workbook again. prune() drops the
+copies of workbooks that have since changed or gone.
+"""
+
+import hashlib
+import json
+import os
+import pandas as pd
+
+from manifest import file_hash
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_ARROW = True
+except ImportError:
+    HAVE_ARROW = False
+
+
+class SheetCache:
+    """Caches parsed sheets under cache_dir, keyed by content hash, reader and options."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def cache_key(self, content_hash, read_kwargs):
+        options = json.dumps(read_kwargs, sort_keys=True, default=str)
+        options_hash = hashlib.sha256(options.encode("utf-8")).hexdigest()[:16]
+        return f"{content_hash}-{options_hash}"
+
+    def load(self, key):
+        feather_path = os.path.join(self.cache_dir, f"{key}.feather")
+        pickle_path = os.path.join(self.cache_dir, f"{key}.pkl")
+        try:
+            if HAVE_ARROW and os.path.exists(feather_path):
+                df = pd.read_feather(feather_path)
+                # Feather only stores string column names; restore the originals
+                with open(f"{feather_path}.columns.json") as f:
+                    df.columns = json.load(f)
+                return df
+            if os.path.exists(pickle_path):
+                return pd.read_pickle(pickle_path)
+        except Exception as e:
+            print(f"Warning: ignoring unreadable cache entry {key}: {str(e)}")
+        return None
+
+    def store(self, key, df):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if HAVE_ARROW:
+            feather_path = os.path.join(self.cache_dir, f"{key}.feather")
+            try:
+                stored = df.reset_index(drop=True)
+                columns = list(stored.columns)
+                stored.columns = [str(c) for c in columns]
+                stored.to_feather(feather_path)
+                with open(f"{feather_path}.columns.json", "w") as f:
+                    json.dump(columns, f, default=str)
+                return
+            except Exception:
+                # Mixed-type object columns can't be written to Arrow; use pickle instead
+                if os.path.exists(feather_path):
+                    os.remove(feather_path)
+        df.to_pickle(os.path.join(self.cache_dir, f"{key}.pkl"))
+
+    def prune(self, paths):
+        """Remove the entries of content no file in paths still has. Returns how many files."""
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        keep = {file_hash(path) for path in paths}
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            # Every file of an entry starts with its key, and so with the content hash
+            if name.split("-", 1)[0] in keep:
+                continue
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                removed += 1
+            except OSError as e:
+                print(f"Warning: could not remove stale cache file {name}: {str(e)}")
+        return removed
+
+    def read(self, path, reader, content_hash=None, **read_kwargs):
+        """reader(path, **read_kwargs), served from the cache when possible."""
+        options = dict(read_kwargs, reader=f"{reader.__module__}.{reader.__name__}")
+        key = self.cache_key(content_hash or file_hash(path), options)
+        df = self.load(key)
+        if df is None:
+            df = reader(path, **read_kwargs)
+            try:
+                self.store(key, df)
+            except Exception as e:
+                print(f"Warning: could not cache {path}: {str(e)}")
+        return df
+
+    def read_excel(self, path, content_hash=None, **read_kwargs):
+        """pd.read_excel(path, **read_kwargs), served from the cache when possible."""
+        return self.read(path, pd.read_excel, content_hash, **read_kwargs)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Streaming, memory-bounded row reader for .xlsx and .ods workbooks.
+
+pd.read_excel materializes the whole sheet. These readers walk the sheet XML with
+iterparse and drop each row as soon as it has been yielded, so memory stays flat
+however many rows the sheet has. Only the .xlsx shared-string table is held in full.
+
+Both formats are read straight from the zip rather than through openpyxl/odfpy. This
+also copes with workbooks openpyxl refuses to open. The income tax brackets workbook
+has merge cells with no column, which openpyxl rejects only after reading every row.
+"""
+
+import posixpath
+import re
+import zipfile
+import pandas as pd
+from xml.etree.ElementTree import iterparse
+
+XLSX_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+ODS_TABLE_NS = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}"
+ODS_OFFICE_NS = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}"
+ODS_TEXT_NS = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+
+# ods files pad sheets out with huge repeat counts; never expand more than this
+MAX_REPEAT = 1000
+
+
+def iter_elements(f, tag):
+    """iterparse f, yielding each finished `tag` element and then detaching it.
+
+    Plain iterparse keeps every finished element attached to its parent, so memory
+    grows with the sheet; removing the row from its parent keeps it flat.
+    """
+    stack = []
+    for event, elem in iterparse(f, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        if elem.tag == tag:
+            yield elem
+            if stack:
+                stack[-1].remove(elem)
+
+
+def parse_number(text):
+    """Cell text to int when it is integral, float otherwise."""
+    if re.fullmatch(r"-?\d+", text):
+        return int(text)
+    return float(text)
+
+
+def column_index(ref):
+    """Zero-based column of a cell reference like "AB12"."""
+    index = 0
+    for char in ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + (ord(char.upper()) - ord("A") + 1)
+    return index - 1
+
+
+# .xlsx
+
+def xlsx_shared_strings(archive):
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as f:
+        for _, elem in iterparse(f):
+            if elem.tag == f"{XLSX_NS}si":
+                strings.append("".join(t.text or "" for t in elem.iter(f"{XLSX_NS}t")))
+                elem.clear()
+    return strings
+
+
+def xlsx_sheet_path(archive, sheet):
+    """Zip path of a worksheet, by position or name."""
+    with archive.open("xl/workbook.xml") as f:
+        sheets = [(elem.get("name"), elem.get(f"{REL_NS}id"))
+                  for _, elem in iterparse(f) if elem.tag == f"{XLSX_NS}sheet"]
+    with archive.open("xl/_rels/workbook.xml.rels") as f:
+        targets = {elem.get("Id"): elem.get("Target")
+                   for _, elem in iterparse(f) if elem.tag == f"{PKG_REL_NS}Relationship"}
+    if isinstance(sheet, int):
+        _, rel_id = sheets[sheet]
+    else:
+        rel_id = dict(sheets)[sheet]
+    target = targets[rel_id]
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join("xl", target))
+
+
+def xlsx_cell_value(cell, shared_strings):
+    cell_type = cell.get("t")
+    if cell_type == "inlineStr":
+        return "".join(t.text or "" for t in cell.iter(f"{XLSX_NS}t"))
+    value = cell.find(f"{XLSX_NS}v")
+    if value is None or value.text is None:
+        return None
+    if cell_type == "s":
+        return shared_strings[int(value.text)]
+    if cell_type == "b":
+        return value.text == "1"
+    if cell_type in ("str", "e"):
+        return value.text
+    return parse_number(value.text)
+
+
+def iter_xlsx_rows(path, sheet=0):
+    with zipfile.ZipFile(path) as archive:
+        shared_strings = xlsx_shared_strings(archive)
+        with archive.open(xlsx_sheet_path(archive, sheet)) as f:
+            for elem in iter_elements(f, f"{XLSX_NS}row"):
+                row = []
+                for cell in elem.iter(f"{XLSX_NS}c"):
+                    ref = cell.get("r")
+                    position = column_index(ref) if ref else len(row)
+                    row.extend([None] * (position - len(row)))
+                    row.append(xlsx_cell_value(cell, shared_strings))
+                while row and row[-1] is None:
+                    row.pop()
+                # Formatted-but-empty rows are common at the end of xlsx sheets
+                if row:
+                    yield row
+
+
+# .ods
+
+def ods_cell_value(cell):
+    value_type = cell.get(f"{ODS_OFFICE_NS}value-type")
+    if value_type in ("float", "percentage", "currency"):
+        return parse_number(cell.get(f"{ODS_OFFICE_NS}value"))
+    if value_type == "boolean":
+        return cell.get(f"{ODS_OFFICE_NS}boolean-value") == "true"
+    if value_type == "date":
+        return cell.get(f"{ODS_OFFICE_NS}date-value")
+    paragraphs = ["".join(p.itertext()) for p in cell.iter(f"{ODS_TEXT_NS}p")]
+    return "\n".join(paragraphs) if paragraphs else None
+
+
+def ods_table_rows(path):
+    """Yield (table index, table name, row element) for every row in the workbook."""
+    with zipfile.ZipFile(path) as archive, archive.open("content.xml") as f:
+        tables = []
+        stack = []
+        for event, elem in iterparse(f, events=("start", "end")):
+            if event == "start":
+                stack.append(elem)
+                if elem.tag == f"{ODS_TABLE_NS}table":
+                    tables.append(elem.get(f"{ODS_TABLE_NS}name"))
+                continue
+            stack.pop()
+            if elem.tag == f"{ODS_TABLE_NS}table-row":
+                yield len(tables) - 1, tables[-1], elem
+                if stack:
+                    stack[-1].remove(elem)
+
+
+def iter_ods_rows(path, sheet=0):
+    for index, name, elem in ods_table_rows(path):
+        if sheet != (index if isinstance(sheet, int) else name):
+            continue
+        row = []
+        for cell in elem:
+            if cell.tag not in (f"{ODS_TABLE_NS}table-cell",
+                                f"{ODS_TABLE_NS}covered-table-cell"):
+                continue
+            repeat = int(cell.get(f"{ODS_TABLE_NS}number-columns-repeated", "1"))
+            row.extend([ods_cell_value(cell)] * min(repeat, MAX_REPEAT))
+        while row and row[-1] is None:
+            row.pop()
+        if not row:
+            # Padding rows at the end of the sheet; an empty row carries no data anyway
+            continue
+        repeat = int(elem.get(f"{ODS_TABLE_NS}number-rows-repeated", "1"))
+        for _ in range(min(repeat, MAX_REPEAT)):
+            yield list(row)
+
+
+def iter_rows(path, sheet=0):
+    """Yield each non-empty row of a sheet as a list of cell values.
+
+    Values are str, int, float, bool or None. Trailing empty cells are dropped, so
+    rows can have different lengths.
+    """
+    if path.lower().endswith(".ods"):
+        return iter_ods_rows(path, sheet)
+    return iter_xlsx_rows(path, sheet)
+
+
+def iter_frames(path, batch_size=1000, sheet=0, header=True, columns=None):
+    """Yield DataFrames of at most batch_size rows.
+
+    With header=True the first row names the columns. columns keeps only those
+    positions, and the frame's columns are then labelled by position.
+    """
+    rows = iter_rows(path, sheet)
+    names = None
+    if header:
+        names = next(rows, None)
+        if names is None:
+            return
+    if columns is None:
+        columns = range(len(names)) if names is not None else None
+    elif names is not None:
+        names = [names[i] if i < len(names) else None for i in columns]
+    batch = []
+    for row in rows:
+        if columns is None:
+            batch.append(row)
+        else:
+            batch.append([row[i] if i < len(row) else None for i in columns])
+        if len(batch) >= batch_size:
+            yield pd.DataFrame(batch, columns=names or columns)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, columns=names or columns)
+
+
+def read_columns(path, sheet=0, columns=None):
+    """Stream a sheet, or only the given column positions, into one headerless DataFrame."""
+    frames = list(iter_frames(path, sheet=sheet, header=False, columns=columns))
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Which states are most alike on taxes, cost of living, crime and education.
+
+A SimilarityIndex standardizes SIMILARITY_FIELDS to z-scores, keeps the Euclidean
+distance between every pair of states, and lists each state's K nearest
+neighbours. write_similar() publishes it next to the states snapshot, and the
+published copy is what the next ingest starts from: update() recomputes only the
+distance rows of the states whose values changed, as long as few did and the
+column means and spreads have barely moved. Otherwise it rebuilds from scratch.
+Keeping the old scale means an updated index can differ slightly from a rebuilt
+one, by no more than MAX_SCALE_DRIFT allows; the next rebuild evens it out.
+"""
+
+import argparse
+import hashlib
+import json
+import numpy as np
+
+from analytics import column_scale, numeric_matrix
+from manifest import records_hash
+from metrics import METRICS
+from snapshot import SNAPSHOT_DIR, SNAPSHOT_NAME, SNAPSHOT_VERSION, read_static, write_static
+
+SIMILAR_NAME = "similar-states"
+SIMILARITY_FIELDS = [
+    "IncomeTax", "SalesTax", "PropertyTaxes", "CapitalGainsTax",
+    "CostOfLiving", "MedianHomePrice",
+    "ViolentCrimes",
+    "K12SchoolPerformance", "HigherEdSchoolPerformance",
+]
+TOP_K = 5
+# An update rebuilds everything when more than this share of states changed...
+MAX_CHANGED_SHARE = 0.2
+# ...or when a column's mean or spread moved by more than this many old spreads
+MAX_SCALE_DRIFT = 0.05
+DISTANCE_DECIMALS = 6
+
+
+def value_hash(values):
+    """Hash of one state's raw values, to spot the states that changed."""
+    text = json.dumps([None if np.isnan(value) else float(value) for value in values])
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def standardize(values, means, spreads):
+    """z-scores against the given scale; missing values and flat columns are 0."""
+    filled = np.where(np.isnan(values), means, values)
+    return np.divide(filled - means, spreads, out=np.zeros_like(filled), where=spreads > 0)
+
+
+def pairwise_distances(rows, features):
+    """[row, state] Euclidean distances from each of rows to every state."""
+    squared = ((rows[:, None, :] - features[None, :, :]) ** 2).sum(axis=2)
+    return np.sqrt(squared)
+
+
+class SimilarityIndex:
+    """Standardized features, the distance matrix and the top-K of every state."""
+
+    def __init__(self, states, fields, means, spreads, hashes, features, distances, k):
+        self.states = states
+        self.fields = fields
+        self.means = means
+        self.spreads = spreads
+        self.hashes = hashes
+        self.features = features
+        self.distances = distances
+        self.k = k
+        self.positions = {state: i for i, state in enumerate(states)}
+        self.neighbours = self.top_k(k)
+
+    @classmethod
+    def build(cls, records, k=TOP_K, fields=SIMILARITY_FIELDS):
+        """Index the records from scratch."""
+        states, values = state_values(records, fields)
+        means, spreads = column_scale(values)
+        features = standardize(values, means, spreads)
+        distances = pairwise_distances(features, features)
+        hashes = [value_hash(row) for row in values]
+        return cls(states, list(fields), means, spreads, hashes, features, distances, k)
+
+    def update(self, records):
+        """The index for new records, reusing this one's distances where possible.
+
+        Returns (index, changed states); changed is None when it rebuilt everything.
+        """
+        states, values = state_values(records, self.fields)
+        if states != self.states:
+            return SimilarityIndex.build(records, self.k, self.fields), None
+        hashes = [value_hash(row) for row in values]
+        changed = [i for i, (old, new) in enumerate(zip(self.hashes, hashes)) if old != new]
+        if not changed:
+            return self, []
+        means, spreads = column_scale(values)
+        scale = np.where(self.spreads > 0, self.spreads, 1)
+        drift = max((np.abs(means - self.means) / scale).max(),
+                    (np.abs(spreads - self.spreads) / scale).max())
+        if len(changed) > MAX_CHANGED_SHARE * len(states) or drift > MAX_SCALE_DRIFT:
+            return SimilarityIndex.build(records, self.k, self.fields), None
+
+        # Keep the old scale, so the unchanged states' rows stay valid
+        features = self.features.copy()
+        features[changed] = standardize(values[changed], self.means, self.spreads)
+        distances = self.distances.copy()
+        rows = pairwise_distances(features[changed], features)
+        distances[changed, :] = rows
+        distances[:, changed] = rows.T
+        index = SimilarityIndex(states, self.fields, self.means, self.spreads, hashes,
+                                features, distances, self.k)
+        return index, [states[i] for i in changed]
+
+    def top_k(self, k):
+        """[state][k] positions of each state's nearest other states, nearest first."""
+        distances = self.distances.copy()
+        np.fill_diagonal(distances, np.inf)
+        return np.argsort(distances, axis=1, kind="stable")[:, :k]
+
+    def similar(self, state, k=None):
+        """[(state, distance)] of the states most like `state`, nearest first."""
+        i = self.positions[state]
+        neighbours = self.neighbours[i] if k is None or k <= self.k else self.top_k(k)[i]
+        return [(self.states[j], float(self.distances[i, j])) for j in neighbours[:k]]
+
+    def to_payload(self, etag):
+        return {
+            "version": SNAPSHOT_VERSION,
+            "etag": etag,
+            "states": self.states,
+            "fields": self.fields,
+            "k": self.k,
+            # state -> [[state, distance], ...], nearest first
+            "similar": {state: [[self.states[j], round(float(self.distances[i, j]),
+                                                       DISTANCE_DECIMALS)]
+                                for j in self.neighbours[i]]
+                        for i, state in enumerate(self.states)},
+            # What the next update starts from
+            "means": self.means.tolist(),
+            "spreads": self.spreads.tolist(),
+            "hashes": self.hashes,
+            "features": np.round(self.features, DISTANCE_DECIMALS).tolist(),
+            "distances": np.round(self.distances, DISTANCE_DECIMALS).tolist(),
+        }
+
+    @classmethod
+    def from_payload(cls, payload):
+        return cls(payload["states"], payload["fields"], np.asarray(payload["means"]),
+                   np.asarray(payload["spreads"]), payload["hashes"],
+                   np.asarray(payload["features"]), np.asarray(payload["distances"]),
+                   payload["k"])
+
+
+def state_values(records, fields):
+    """(state names, [state, field] raw values) in name order; missing values are NaN."""
+    records = sorted(records, key=lambda record: str(record.get("Name")))
+    return ([record.get("Name") for record in records],
+            numeric_matrix(records, fields, missing=np.nan))
+
+
+def build_similar(records, previous=None, k=TOP_K):
+    """Index the records, incrementally from a previous index when it fits."""
+    with METRICS.timer("stage_seconds", stage="analyze"):
+        if previous is None or previous.k != k or previous.fields != SIMILARITY_FIELDS:
+            return SimilarityIndex.build(records, k)
+        index, changed = previous.update(records)
+    if changed is None:
+        print("Rebuilt the similar-states index")
+    elif changed:
+        print(f"Updated the similar-states index for {len(changed)} changed states: "
+              f"{', '.join(changed)}")
+    return index
+
+
+def write_similar(records, out_dir, use_msgpack=False, k=TOP_K):
+    """Update and publish the index next to the states snapshot. Returns the index."""
+    previous = None
+    try:
+        payload = read_static(SIMILAR_NAME, out_dir)
+        if payload is not None:
+            previous = SimilarityIndex.from_payload(payload)
+    except Exception as e:
+        print(f"Warning: rebuilding the similar-states index from scratch: {str(e)}")
+    index = build_similar(records, previous, k)
+    payload = index.to_payload(None)
+    etag = records_hash([payload])[:16]
+    payload["etag"] = etag
+    write_static(SIMILAR_NAME, payload, etag, len(index.states), out_dir, use_msgpack)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the states most like a state.")
+    parser.add_argument("state")
+    parser.add_argument("--top", type=int, default=TOP_K)
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    payload = read_static(SIMILAR_NAME, args.snapshot_dir)
+    if payload is not None:
+        index = SimilarityIndex.from_payload(payload)
+    else:
+        snapshot = read_static(SNAPSHOT_NAME, args.snapshot_dir)
+        if snapshot is None:
+            print(f"No states snapshot in {args.snapshot_dir}; run the ingest with --snapshot")
+            return
+        index = SimilarityIndex.build(snapshot["states"])
+    if args.state not in index.positions:
+        print(f"Unknown state: {args.state}")
+        return
+    print(f"States most like {args.state}:")
+    for state, distance in index.similar(args.state, args.top):
+        print(f"  {state:<22} {distance:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Static, versioned snapshot of the merged state dataset.
+
+The client pages all fetch the same ~50 documents. write_snapshot() saves them as
+a gzipped JSON file (and a MessagePack one when msgpack is installed) whose name
+carries a content hash, e.g. states.3f2a9c1b0d4e5f67.json.gz, so it can be served
+with a far-future cache lifetime. A small uncompressed states.latest.json index
+names the current files, their ETag and a revision number that goes up with every
+change; it is the only file that changes between runs. Writing the same data again
+changes nothing on disk.
+
+write_static() does the same for any other dataset published next to it, such as
+the income tax bracket tables, each under its own name. write_binary() publishes
+raw arrays the same way, with the layout described in the index.
+"""
+
+import gzip
+import json
+import os
+import time
+
+from manifest import encode_value, records_hash
+from state_record import DERIVED_FIELDS, STATE_FIELDS
+
+try:
+    import msgpack
+    HAVE_MSGPACK = True
+except ImportError:
+    HAVE_MSGPACK = False
+
+# Bump when the snapshot layout changes in a way readers must know about
+SNAPSHOT_VERSION = 1
+SNAPSHOT_NAME = "states"
+# Served by the Next.js client as /data/...
+SNAPSHOT_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                             "..", "..", "client", "public", "data"))
+# Older snapshot files kept around for clients still holding the previous index
+KEEP_SNAPSHOTS = 3
+
+
+def snapshot_etag(records):
+    """Content hash of the records, stable across runs and key order."""
+    return records_hash(records)[:16]
+
+
+def snapshot_payload(records, etag):
+    return {
+        "version": SNAPSHOT_VERSION,
+        "etag": etag,
+        "fields": STATE_FIELDS + DERIVED_FIELDS,
+        "states": [record.to_dict() if hasattr(record, "to_dict") else dict(record)
+                   for record in records],
+    }
+
+
+def write_atomic(path, data):
+    partial = f"{path}.partial"
+    with open(partial, "wb") as f:
+        f.write(data)
+    os.replace(partial, path)
+
+
+def compress(data):
+    # mtime=0 keeps the gzip bytes identical for identical data
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def index_name(name):
+    return f"{name}.latest.json"
+
+
+def prune_snapshots(out_dir, keep_files, name=SNAPSHOT_NAME):
+    """Remove all but the newest KEEP_SNAPSHOTS generations of `name` files."""
+    snapshots = [file for file in os.listdir(out_dir)
+                 if file.startswith(f"{name}.") and file != index_name(name)
+                 and not file.endswith(".partial")]
+    by_etag = {}
+    for file in snapshots:
+        etag = file.split(".")[1]
+        mtime = os.path.getmtime(os.path.join(out_dir, file))
+        by_etag[etag] = max(by_etag.get(etag, 0), mtime)
+    newest = sorted(by_etag, key=by_etag.get, reverse=True)[:KEEP_SNAPSHOTS]
+    for file in snapshots:
+        if file.split(".")[1] not in newest and file not in keep_files:
+            os.remove(os.path.join(out_dir, file))
+
+
+def load_index(index_path):
+    """The index at index_path, or None if there is none or it can't be read."""
+    if not os.path.exists(index_path):
+        return None
+    try:
+        with open(index_path) as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Warning: ignoring unreadable snapshot index: {str(e)}")
+        return None
+
+
+def up_to_date(previous, etag, files, out_dir):
+    return bool(previous and previous.get("etag") == etag and previous.get("files") == files
+                and all(os.path.exists(os.path.join(out_dir, file))
+                        for file in files.values()))
+
+
+def write_files(name, out_dir, etag, count, contents, previous, **fields):
+    """Write {kind: (file name, data, stored data)} and then the index naming them.
+
+    Extra fields go into the index as they are. Returns the index dict.
+    """
+    sizes = {}
+    for kind, (file, data, stored) in contents.items():
+        write_atomic(os.path.join(out_dir, file), stored)
+        sizes[kind] = {"bytes": len(data)}
+        if stored is not data:
+            sizes[kind]["compressed"] = len(stored)
+    index = {
+        "version": SNAPSHOT_VERSION,
+        # Goes up by one every time the data changes
+        "revision": (previous or {}).get("revision", 0) + 1,
+        "etag": etag,
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "count": count,
+        "files": {kind: file for kind, (file, _, _) in contents.items()},
+        "sizes": sizes,
+    }
+    index.update(fields)
+    # The index goes last, so it never names a file that isn't there yet
+    write_atomic(os.path.join(out_dir, index_name(name)),
+                 json.dumps(index, indent=2).encode("utf-8"))
+    prune_snapshots(out_dir, set(index["files"].values()), name)
+    return index
+
+
+def write_static(name, payload, etag, count, out_dir, use_msgpack=False):
+    """Write payload as <name>.<etag>.json.gz (and .msgpack.gz) plus its index.
+
+    Returns the index dict. Nothing is written when the index already names etag.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    files = {"json": f"{name}.{etag}.json.gz"}
+    if use_msgpack:
+        if HAVE_MSGPACK:
+            files["msgpack"] = f"{name}.{etag}.msgpack.gz"
+        else:
+            print("Warning: msgpack is not installed, writing the JSON snapshot only")
+
+    previous = load_index(os.path.join(out_dir, index_name(name)))
+    if up_to_date(previous, etag, files, out_dir):
+        print(f"Snapshot {name}.{etag} is up to date in {out_dir}")
+        return previous
+
+    encoded = {"json": json.dumps(payload, separators=(",", ":"), default=encode_value)
+               .encode("utf-8")}
+    if "msgpack" in files:
+        encoded["msgpack"] = msgpack.packb(payload, default=encode_value)
+    contents = {kind: (file, encoded[kind], compress(encoded[kind]))
+                for kind, file in files.items()}
+    index = write_files(name, out_dir, etag, count, contents, previous)
+    print(f"Wrote snapshot {name}.{etag} ({count} entries, "
+          f"{index['sizes']['json']['compressed']} bytes gzipped) to {out_dir}")
+    return index
+
+
+def write_binary(name, data, etag, count, out_dir, suffix="bin", **fields):
+    """Write raw bytes as <name>.<etag>.<suffix>, uncompressed so they can be read
+    with range requests, and an index carrying `fields` that describes their layout.
+
+    Returns the index dict. Nothing is written when the index already names etag.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    files = {suffix: f"{name}.{etag}.{suffix}"}
+    previous = load_index(os.path.join(out_dir, index_name(name)))
+    if up_to_date(previous, etag, files, out_dir):
+        print(f"Snapshot {name}.{etag} is up to date in {out_dir}")
+        return previous
+    index = write_files(name, out_dir, etag, count, {suffix: (files[suffix], data, data)},
+                        previous, **fields)
+    print(f"Wrote snapshot {name}.{etag} ({len(data)} bytes) to {out_dir}")
+    return index
+
+
+def read_static(name, out_dir):
+    """The payload write_static() last published under name, or None if there is none."""
+    index_path = os.path.join(out_dir, index_name(name))
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path) as f:
+        index = json.load(f)
+    with gzip.open(os.path.join(out_dir, index["files"]["json"])) as f:
+        return json.load(f)
+
+
+def write_snapshot(records, out_dir, use_msgpack=False):
+    """Write the states snapshot files and the index. Returns the index dict."""
+    etag = snapshot_etag(records)
+    return write_static(SNAPSHOT_NAME, snapshot_payload(records, etag), etag, len(records),
+                        out_dir, use_msgpack)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Registry of source workbooks and the States fields each one provides.
+
+Every Source names a file in state-info/, the columns to read from it (by position;
+column 0 is always the state name), the States field each column fills and how to
+coerce the raw cell. build_state_records() streams only those columns out of every
+file, in parallel, and merges them into one record per state.
+"""
+
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from loader import US_STATES, normalize_state_name
+from manifest import file_hash
+from metrics import METRICS
+from sheet_cache import SheetCache
+from sheet_reader import read_columns
+from state_record import STATE_FIELDS, StateRecord
+
+
+# Conversions from a raw cell to a field value; schema.py types, rounds and range
+# checks the result. These are module-level functions so Sources can be pickled
+# into worker processes.
+
+def number(value):
+    return float(value)
+
+
+def percent(value):
+    """Fraction (0.0725) to a percentage (7.25)."""
+    return float(value) * 100
+
+
+def integer(value):
+    return int(round(float(value)))
+
+
+def text(value):
+    return " ".join(str(value).split())
+
+
+def wage(value):
+    """Minimum wage cell to dollars.
+
+    Cells are numbers, "No state law", ranges ("13.70–15.95", upper bound wins) or
+    tiered notes ("10.55 (> $110k); $4.00 (≤ $110k)", the first, headline rate wins).
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = text(value)
+    numbers = re.findall(r"\d+(?:\.\d+)?", value)
+    if not numbers:
+        return value
+    match = re.match(r"^\s*(\d+(?:\.\d+)?)\s*[–-]\s*(\d+(?:\.\d+)?)\s*$", value)
+    if match:
+        return float(match.group(2))
+    return float(numbers[0])
+
+
+class Source:
+    """One workbook and the fields it provides.
+
+    fields maps a States field to (column position, coerce). missing supplies raw
+    values for states the workbook doesn't list, either per state or as one default.
+    """
+
+    def __init__(self, filename, fields, sheet=0, missing=None):
+        self.filename = filename
+        self.fields = fields
+        self.sheet = sheet
+        self.missing = missing or {}
+
+    def columns(self):
+        return sorted({0} | {column for column, _ in self.fields.values()})
+
+    def missing_value(self, state):
+        if isinstance(self.missing, dict):
+            return self.missing.get(state)
+        return self.missing
+
+
+SOURCES = [
+    Source("2024 State Mediam Home Price.xlsx", {"MedianHomePrice": (1, number)}),
+    Source("2025 State Capital Gains Tax.ods", {"CapitalGainsTax": (1, percent)}),
+    Source("2025-State-Individual-Income-Tax-Rates-and-Brackets-2025.xlsx",
+           {"IncomeTax": (1, percent)}),
+    Source("Sales Tax by State and County.xlsx", {"SalesTax": (1, percent)}),
+    Source("Property Taxes by State and County, 2025  Tax Foundation Maps.xlsx",
+           {"PropertyTaxes": (1, percent)}),
+    Source("abortion.xlsx", {"Abortion": (1, text)},
+           missing={"District of Columbia": "A"}),
+    Source("cost_of_living.ods", {"CostOfLiving": (1, number)}),
+    Source("education.ods", {"K12SchoolPerformance": (1, integer),
+                             "HigherEdSchoolPerformance": (2, integer)}),
+    Source("Forested Land.xlsx", {"ForestedLand": (1, percent)}),
+    Source("Gun-Laws.ods", {"GunLaws": (1, text)},
+           missing={"District of Columbia": "A"}),
+    # States without a minimum wage law of their own fall back to the federal minimum
+    Source("Minimum_Wage_By_State.xlsx", {"MinimumWage": (1, wage)}, missing=7.25),
+    Source("population-2020.xlsx", {"Population": (1, integer)},
+           missing={"District of Columbia": 705749}),
+    Source("violent_crimes.ods", {"ViolentCrimes": (1, number)}),
+    Source("voting.xlsx", {"PoliticalLeaning": (1, text)}),
+]
+
+
+def read_source(source, path, cache_dir=None):
+    """Read only the columns a source needs."""
+    kwargs = {"sheet": source.sheet, "columns": source.columns()}
+    if cache_dir is None:
+        return read_columns(path, **kwargs)
+    return SheetCache(cache_dir).read(path, read_columns, file_hash(path), **kwargs)
+
+
+def extract_fields(source, df):
+    """Turn a source sheet into {state: {field: value}}, coercing a column at a time."""
+    df = df.set_axis(source.columns(), axis=1)
+    names = df[0].map(normalize_state_name)
+    df = df[names.notna()].set_axis(names[names.notna()], axis=0)
+    df = df[~df.index.duplicated()]
+    values = {state: {} for state in df.index}
+    for field, (column, coerce) in source.fields.items():
+        cells = df[column]
+        for state, value in cells[cells.notna()].map(coerce).items():
+            values[state][field] = value
+    for state in US_STATES:
+        if state in values:
+            continue
+        default = source.missing_value(state)
+        if default is not None:
+            values[state] = {field: coerce(default)
+                             for field, (_, coerce) in source.fields.items()}
+    return values
+
+
+def parse_source(source, excel_dir, cache_dir=None):
+    """Parse one source. Runs in a worker process.
+
+    Returns (source, {state: {field: value}}, timings, error), where timings holds
+    the seconds spent reading the file and extracting the fields.
+    """
+    timings = {}
+    start = time.perf_counter()
+    try:
+        df = read_source(source, os.path.join(excel_dir, source.filename), cache_dir)
+        timings["read"] = time.perf_counter() - start
+        start = time.perf_counter()
+        values = extract_fields(source, df)
+        timings["parse"] = time.perf_counter() - start
+        return source, values, timings, None
+    except Exception as e:
+        timings.setdefault("read", time.perf_counter() - start)
+        return source, {}, timings, str(e)
+
+
+def build_state_records(excel_dir, workers=None, cache_dir=None, sources=SOURCES):
+    """Build one States record per state from the source workbooks.
+
+    Returns (records in state order, file names of the sources that failed). Fields
+    a failed source would have provided are left out; validation reports them.
+    """
+    start = time.perf_counter()
+    count = len(sources)
+    if workers == 1:
+        results = [parse_source(source, excel_dir, cache_dir) for source in sources]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse_source, sources, [excel_dir] * count,
+                                    [cache_dir] * count))
+    merged = {state: {"Name": state} for state in US_STATES}
+    failed = []
+    for source, values, timings, error in results:
+        # Workers have their own METRICS, so their timings are recorded here
+        for stage, stage_seconds in timings.items():
+            METRICS.observe("stage_seconds", stage_seconds, stage=stage)
+        seconds = sum(timings.values())
+        if error:
+            METRICS.count("sources_total", outcome="failed")
+            print(f"  {source.filename}: failed after {seconds:.2f}s: {error}")
+            failed.append(source.filename)
+            continue
+        METRICS.count("sources_total", outcome="ok")
+        print(f"  {source.filename}: {len(values)} states in {seconds:.2f}s")
+        for state, fields in values.items():
+            merged[state].update(fields)
+
+    records = []
+    with METRICS.timer("stage_seconds", stage="map"):
+        for state in US_STATES:
+            records.append(StateRecord((field, merged[state][field])
+                                       for field in STATE_FIELDS if field in merged[state]))
+    print(f"Built {len(records)} states from {count} sources "
+          f"in {time.perf_counter() - start:.2f}s")
+    return records, failed
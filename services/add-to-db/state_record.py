@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""The record types the ingest passes between stages.
+
+A StateRecord holds one state's values in slots, in the field order of the States
+model, and a CountyRecord holds one county's in the order of the Counties model.
+Either costs a fixed handful of pointers instead of a dict per row, and stages
+update it in place rather than copying it. Both support the read-only mapping
+methods the pipeline uses (get, items, keys, `in`, []) and convert to a plain dict
+only at the edge, when they are serialized for the API.
+"""
+
+# Field order of the States model
+STATE_FIELDS = [
+    "MedianHomePrice", "CapitalGainsTax", "IncomeTax", "SalesTax", "PropertyTaxes",
+    "Abortion", "CostOfLiving", "K12SchoolPerformance", "HigherEdSchoolPerformance",
+    "ForestedLand", "GunLaws", "MinimumWage", "Population", "ViolentCrimes",
+    "PoliticalLeaning", "Name",
+]
+# States model fields computed at ingest time rather than read from the workbooks
+DERIVED_FIELDS = ["AffordabilityScore"]
+# Field order of the Counties model. Fips is the five-digit state + county code.
+COUNTY_FIELDS = ["Fips", "StateFips", "State", "County", "SalesTax", "PropertyTaxes"]
+
+
+class Record:
+    """Base for slotted records; subclasses list their fields (and _id) in __slots__.
+
+    Unset fields are absent, as missing dict keys were. _id holds the database id of
+    the document the record updates, if any.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, values=(), **fields):
+        if hasattr(values, "items"):
+            values = values.items()
+        for field, value in values:
+            self[field] = value
+        for field, value in fields.items():
+            self[field] = value
+
+    @classmethod
+    def from_frame(cls, df, skip_missing=False):
+        """One record per DataFrame row, from the columns named after States fields.
+
+        Other columns are ignored; the model would discard them anyway. With
+        skip_missing, None/NaN cells leave the field unset.
+        """
+        fields = [column for column in df.columns if column in cls.__slots__]
+        if not fields:
+            return [cls() for _ in range(len(df))]
+        records = []
+        for row in zip(*(df[field].tolist() for field in fields)):
+            record = cls()
+            for field, value in zip(fields, row):
+                if skip_missing and (value is None or value != value):
+                    continue
+                setattr(record, field, value)
+            records.append(record)
+        return records
+
+    def __getitem__(self, field):
+        if field not in self.__slots__ or not hasattr(self, field):
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __setitem__(self, field, value):
+        if field not in self.__slots__:
+            raise KeyError(f"{field!r} is not a {type(self).__name__} field")
+        setattr(self, field, value)
+
+    def __delitem__(self, field):
+        if field not in self:
+            raise KeyError(field)
+        delattr(self, field)
+
+    def __contains__(self, field):
+        return field in self.__slots__ and hasattr(self, field)
+
+    def get(self, field, default=None):
+        return getattr(self, field, default) if field in self.__slots__ else default
+
+    def keys(self):
+        return [field for field in self.__slots__ if hasattr(self, field)]
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in self.__slots__
+                if hasattr(self, field)]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def replace(self, **changes):
+        """A copy of the record with some fields changed."""
+        record = type(self)(self.items())
+        for field, value in changes.items():
+            record[field] = value
+        return record
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return type(self) is type(other) and self.items() == other.items()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    __hash__ = None
+
+
+class StateRecord(Record):
+    """One state's values, in States model field order."""
+
+    __slots__ = tuple(STATE_FIELDS) + tuple(DERIVED_FIELDS) + ("_id",)
+
+
+class CountyRecord(Record):
+    """One county's values, in Counties model field order."""
+
+    __slots__ = tuple(COUNTY_FIELDS) + ("_id",)
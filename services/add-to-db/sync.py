@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Diff local state records against the documents already in the database."""
+
+
+def normalize_value(value):
+    """Normalize a field value so "221490.00", "221490" and 221490.0 compare equal."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value).strip()
+
+
+def diff_state(local, remote):
+    """Return {field: (old, new)} for every local field whose value differs remotely."""
+    changes = {}
+    for field, new in local.items():
+        if field.startswith("_"):
+            continue
+        old = remote.get(field)
+        if normalize_value(old) != normalize_value(new):
+            changes[field] = (old, new)
+    return changes
+
+
+class SyncPlan:
+    """What a sync run would do: which states to create, update or leave alone."""
+
+    def __init__(self):
+        self.creates = []
+        self.updates = []  # (record, changes)
+        self.unchanged = []
+
+    def records(self):
+        """Records that need sending. Updates carry the existing document's _id."""
+        return self.creates + [record for record, _ in self.updates]
+
+    def print_report(self):
+        print(f"Sync plan: {len(self.creates)} to create, {len(self.updates)} to update, "
+              f"{len(self.unchanged)} unchanged")
+        for record in self.creates:
+            print(f"  + {record.get('Name')}")
+        for record, changes in self.updates:
+            print(f"  ~ {record.get('Name')}")
+            for field, (old, new) in sorted(changes.items()):
+                print(f"      {field}: {old!r} -> {new!r}")
+
+
+def plan_sync(local_records, existing):
+    """Build a SyncPlan from local records and {name: document} of existing states."""
+    plan = SyncPlan()
+    for record in local_records:
+        remote = existing.get(record.get("Name"))
+        if remote is None:
+            plan.creates.append(record)
+            continue
+        changes = diff_state(record, remote)
+        if not changes:
+            plan.unchanged.append(record)
+            continue
+        plan.updates.append((record.replace(_id=remote.get("_id")), changes))
+    return plan
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""Column-at-a-time validation of state data, with one consolidated report.
+
+validate_frame() checks whole columns against STATE_SCHEMA at once: types, ranges
+and allowed values (letter grades, political leanings, state names), then the rules
+in RULES, which compare rows (duplicate names, shared ranks) or fields of one row
+(capital gains taxed above the top income tax rate). Nothing is printed per row;
+every problem is counted into a ValidationReport that lists, per field and check,
+how many rows failed and a few examples. Rows that fail an error-level check,
+including those missing a required value, are dropped from the result.
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from metrics import METRICS
+from schema import STATE_SCHEMA
+from state_record import STATE_FIELDS, StateRecord
+
+# Fields every States document should have
+REQUIRED_FIELDS = list(STATE_FIELDS)
+# Rows quoted per problem in the report
+MAX_EXAMPLES = 5
+
+
+class Rule:
+    """A check across fields or rows. check(df) returns a mask of failing rows.
+
+    Rules run on the typed frame, so numeric fields hold numbers (NaN where the
+    value was missing or invalid).
+    """
+
+    def __init__(self, name, fields, check, message, severity="error"):
+        self.name = name
+        self.fields = fields
+        self.check = check
+        self.message = message
+        self.severity = severity
+
+
+def duplicated(df, field):
+    return df[field].notna() & df[field].duplicated(keep="first")
+
+
+RULES = [
+    Rule("duplicate", ["Name"], lambda df: duplicated(df, "Name"),
+         "state appears more than once; later rows are dropped"),
+    Rule("shared-rank", ["K12SchoolPerformance"],
+         lambda df: duplicated(df, "K12SchoolPerformance"),
+         "rank is shared with another state", severity="warning"),
+    Rule("shared-rank", ["HigherEdSchoolPerformance"],
+         lambda df: duplicated(df, "HigherEdSchoolPerformance"),
+         "rank is shared with another state", severity="warning"),
+    # Most states tax capital gains as income; a higher rate (Massachusetts' rate on
+    # short-term gains) is real but rare enough to check against the sources
+    Rule("above-income-tax", ["CapitalGainsTax", "IncomeTax"],
+         lambda df: df["CapitalGainsTax"] > df["IncomeTax"],
+         "capital gains rate is above the top income tax rate", severity="warning"),
+]
+
+
+class EarlierRows:
+    """The rule columns of a stream's earlier batches.
+
+    Passed to validate_frame() batch after batch, it lets cross-row rules such as
+    duplicate names catch repeats that fall in different batches.
+    """
+
+    def __init__(self, rules=RULES):
+        self.fields = sorted({field for rule in rules for field in rule.fields})
+        self.frame = None
+
+    def with_batch(self, typed):
+        """The earlier rows followed by typed's, which are remembered for next time."""
+        batch = typed[[field for field in self.fields if field in typed.columns]]
+        rows = batch if self.frame is None else pd.concat([self.frame, batch],
+                                                          ignore_index=True)
+        # A row repeating an earlier one adds nothing the rules can use
+        self.frame = rows.drop_duplicates(ignore_index=True)
+        return rows
+
+
+class ValidationReport:
+    """Everything wrong with a batch of rows, grouped by field and check."""
+
+    def __init__(self, rows, names=None):
+        self.rows = rows
+        self.names = names
+        self.missing_columns = []
+        self.issues = []
+        self.invalid = np.zeros(rows, dtype=bool)
+
+    def add(self, severity, field, check, message, mask, values=None):
+        mask = np.asarray(mask, dtype=bool)
+        count = int(mask.sum())
+        if not count:
+            return
+        examples = []
+        for i in np.flatnonzero(mask)[:MAX_EXAMPLES]:
+            examples.append({"row": self.row_label(i), "value": None if values is None
+                             else json_value(values[i])})
+        self.issues.append({"severity": severity, "field": field, "check": check,
+                            "message": message, "count": count, "examples": examples})
+        if severity == "error":
+            self.invalid |= mask
+
+    def row_label(self, i):
+        """The row's state name, or its 1-based position when it has none."""
+        name = self.names[i] if self.names is not None else None
+        if isinstance(name, str) and name.strip():
+            return " ".join(name.split())
+        return f"row {i + 1}"
+
+    def extend(self, other):
+        """Fold another batch's report into this one, e.g. across streamed batches."""
+        for column in other.missing_columns:
+            if column not in self.missing_columns:
+                self.missing_columns.append(column)
+        for issue in other.issues:
+            key = (issue["severity"], issue["field"], issue["check"], issue["message"])
+            same = [mine for mine in self.issues
+                    if (mine["severity"], mine["field"], mine["check"], mine["message"]) == key]
+            if same:
+                same[0]["count"] += issue["count"]
+                room = MAX_EXAMPLES - len(same[0]["examples"])
+                same[0]["examples"].extend(issue["examples"][:max(room, 0)])
+            else:
+                self.issues.append(dict(issue, examples=list(issue["examples"])))
+        self.rows += other.rows
+        self.invalid = np.concatenate([self.invalid, other.invalid])
+
+    @property
+    def invalid_count(self):
+        return int(self.invalid.sum())
+
+    @property
+    def ok(self):
+        return not self.invalid.any()
+
+    def to_dict(self):
+        return {"rows": self.rows, "invalid": self.invalid_count,
+                "missing_columns": self.missing_columns, "issues": self.issues}
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+    def print_report(self):
+        print(f"Validation: {self.rows} rows, {self.rows - self.invalid_count} valid, "
+              f"{self.invalid_count} rejected")
+        if self.missing_columns:
+            print(f"  Missing columns: {', '.join(self.missing_columns)}")
+        for issue in self.issues:
+            examples = ", ".join(f"{example['row']} ({example['value']!r})"
+                                 if example["value"] is not None else str(example["row"])
+                                 for example in issue["examples"])
+            more = ", ..." if issue["count"] > len(issue["examples"]) else ""
+            print(f"  {issue['severity']}: {issue['field']} {issue['check']}: "
+                  f"{issue['message']} - {issue['count']} rows: {examples}{more}")
+
+
+def json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def normalize_text(column):
+    """Collapse runs of whitespace, as Field.coerce does for one value."""
+    return column.astype(str).str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def check_column(field, spec, column, report):
+    """Type, range and enum checks for one column. Returns the typed column."""
+    missing = column.isna().to_numpy()
+    raw = column.to_numpy(dtype=object)
+    if spec.kind == "category":
+        text = normalize_text(column)
+        bad = ~missing
+        if spec.choices is not None:
+            bad &= ~text.isin(spec.choices).to_numpy()
+            choices = (", ".join(sorted(spec.choices)) if len(spec.choices) <= MAX_EXAMPLES * 3
+                       else f"the {len(spec.choices)} allowed values")
+            report.add("error", field, "enum", f"not one of {choices}", bad, raw)
+        return pd.Series(np.where(missing, None, text.to_numpy(dtype=object)),
+                         index=column.index, dtype=object)
+
+    # Only fields that allow some text (MinimumWage's "No state law") need it normalized
+    text = normalize_text(column) if spec.text else None
+    allowed_text = np.zeros(len(column), dtype=bool)
+    if text is not None:
+        allowed_text = text.isin(spec.text).to_numpy() & ~missing
+    numbers = pd.to_numeric(column.where(~allowed_text), errors="coerce").astype(float)
+    numbers[np.isinf(numbers)] = np.nan
+    not_number = numbers.isna().to_numpy() & ~missing & ~allowed_text
+    reason = "not an integer" if spec.kind == "integer" else "not a number"
+    report.add("error", field, "type", reason, not_number, raw)
+    if spec.minimum is not None:
+        report.add("error", field, "range", f"below {spec.minimum}",
+                   (numbers < spec.minimum).to_numpy(), raw)
+    if spec.maximum is not None:
+        report.add("error", field, "range", f"above {spec.maximum}",
+                   (numbers > spec.maximum).to_numpy(), raw)
+
+    if spec.kind == "integer":
+        numbers = numbers.round()
+    elif spec.decimals is not None:
+        numbers = numbers.round(spec.decimals)
+    typed = pd.Series([None] * len(column), index=column.index, dtype=object)
+    present = numbers.notna().to_numpy()
+    if spec.kind == "integer":
+        typed[present] = [int(value) for value in numbers[present]]
+    else:
+        typed[present] = numbers[present].tolist()
+    if allowed_text.any():
+        typed[allowed_text] = text[allowed_text]
+    return typed
+
+
+def validate_frame(df, schema=STATE_SCHEMA, required=REQUIRED_FIELDS, rules=RULES,
+                   label="Name", earlier=None):
+    """Validate every column of df at once.
+
+    Returns (typed frame, report). The typed frame holds numbers for numeric fields
+    and normalized strings for categories, with None for missing values; rows that
+    failed an error-level check are still in it, marked in report.invalid. A row
+    without a value for a required field, or from a frame without a required
+    column, fails. The report names rows by their `label` column. earlier, an
+    EarlierRows, runs the rules over every batch validated with it so far.
+    """
+    df = df.reset_index(drop=True)
+    names = df[label].tolist() if label in df.columns else None
+    report = ValidationReport(len(df), names)
+    if len(df):
+        report.missing_columns = [field for field in required if field not in df.columns]
+        # A required column that isn't there leaves every row without a value
+        for field in report.missing_columns:
+            report.add("error", field, "missing", "column is missing",
+                       np.ones(len(df), dtype=bool))
+
+    typed = df.copy()
+    for field, spec in schema.items():
+        if field in df.columns:
+            typed[field] = check_column(field, spec, df[field], report)
+    for field in required:
+        if field in df.columns:
+            report.add("error", field, "missing", "no value", df[field].isna())
+    rows = typed if earlier is None else earlier.with_batch(typed)
+    for rule in rules:
+        if all(field in rows.columns for field in rule.fields):
+            values = typed[rule.fields[0]].to_numpy(dtype=object)
+            # Only this batch's rows are reported
+            mask = np.asarray(rule.check(rows), dtype=bool)[len(rows) - len(typed):]
+            report.add(rule.severity, ", ".join(rule.fields), rule.name, rule.message,
+                       mask, values)
+    return typed, report
+
+
+def records_from_frame(checked, typed=True):
+    """StateRecords from the rows of a typed frame validate_frame() returned.
+
+    With typed=False values are converted back to the historical string format.
+    """
+    if not typed:
+        checked = checked.copy()
+        for field, spec in STATE_SCHEMA.items():
+            if field in checked.columns:
+                checked[field] = checked[field].map(
+                    lambda value, spec=spec: value if value is None
+                    else spec.to_string(value))
+    return StateRecord.from_frame(checked, skip_missing=True)
+
+
+def validate_records(records, typed=True):
+    """Validate StateRecords, returning (valid records, report).
+
+    With typed=False values are converted back to the historical string format.
+    """
+    with METRICS.timer("stage_seconds", stage="validate"):
+        df = pd.DataFrame([record.to_dict() for record in records],
+                          columns=[field for field in StateRecord.__slots__])
+        df = df.dropna(axis=1, how="all")
+        checked, report = validate_frame(df)
+        valid = records_from_frame(checked[~report.invalid], typed)
+    METRICS.count("records_total", len(valid), stage="validate", outcome="valid")
+    METRICS.count("records_total", report.invalid_count, stage="validate",
+                  outcome="invalid")
+    return valid, report